@@ -0,0 +1,82 @@
+"""
+Benchmarks for pyrovider, using pytest-benchmark.
+
+Run them with `python -m pytest benchmarks --benchmark-autosave` to keep the results under `.benchmarks/`,
+and compare a later run against the last saved one with `python -m pytest benchmarks --benchmark-compare`.
+"""
+
+import pytest
+import yaml
+
+from pyrovider.services.provider import ServiceProvider
+
+
+class Service:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+SERVICE = Service()
+
+SERVICE_CLASS = "benchmarks.conftest.Service"
+
+
+def make_service_conf(count: int, namespace: str = "", app_conf: bool = True) -> dict:
+    """
+    Make a conf of `count` services, each depending on the one before it, with a few other arguments,
+    including a reference to `APP_CONF` unless `app_conf` is false.
+    """
+    prefix = f"{namespace}." if namespace else ""
+    service_conf = {f"{prefix}service0": {"class": SERVICE_CLASS}}
+
+    for i in range(1, count):
+        service_conf[f"{prefix}service{i}"] = {
+            "class": SERVICE_CLASS,
+            "arguments": [
+                f"@{prefix}service{i - 1}",
+                "%app.name%" if app_conf else "app",
+                ["$BENCHMARK_ENV_VAR", "default"],
+            ],
+            "named_arguments": {"literal": i},
+        }
+
+    return service_conf
+
+
+APP_CONF = {"app": {"name": "benchmarks", "nested": {"a": {"b": {"c": 1}}}}}
+
+
+@pytest.fixture
+def provider():
+    provider = ServiceProvider()
+    provider.conf(
+        {
+            "instance": {"instance": "benchmarks.conftest.SERVICE"},
+            "class": {"class": SERVICE_CLASS},
+            "a.b.c.d.service": {"class": SERVICE_CLASS},
+            "arg.service": {"class": SERVICE_CLASS, "arguments": ["@class"]},
+            "arg.conf": {"class": SERVICE_CLASS, "arguments": ["%app.nested.a.b.c%"]},
+            "arg.env": {"class": SERVICE_CLASS, "arguments": [["$BENCHMARK_ENV_VAR", "default"]]},
+            "arg.import": {"class": SERVICE_CLASS, "arguments": ["^benchmarks.conftest.SERVICE"]},
+            "arg.list": {"class": SERVICE_CLASS, "arguments": [["@class", "%app.name%", "literal"]]},
+            "arg.literal": {"class": SERVICE_CLASS, "arguments": ["literal"], "named_arguments": {"n": 1}},
+        },
+        APP_CONF,
+    )
+
+    return provider
+
+
+@pytest.fixture(scope="session")
+def service_conf_files(tmp_path_factory):
+    """Write ten YAML files of 200 services each."""
+    directory = tmp_path_factory.mktemp("service_confs")
+    paths = []
+
+    for i in range(10):
+        path = directory / f"services_{i}.yaml"
+        path.write_text(yaml.safe_dump(make_service_conf(200, f"source{i}", app_conf=False)))
+        paths.append(path)
+
+    return paths
@@ -0,0 +1,50 @@
+import pytest
+
+from pyrovider.services.factories import (
+    ServiceDefinitionSource,
+    service_provider_from_sources,
+    service_provider_from_yaml,
+)
+from pyrovider.services.provider import ServiceProvider
+
+from .conftest import APP_CONF, make_service_conf
+
+
+def test_conf_10k_services(benchmark):
+    service_conf = make_service_conf(10_000)
+
+    def conf():
+        ServiceProvider().conf(service_conf, APP_CONF)
+
+    benchmark(conf)
+
+
+def test_conf_10k_namespaced_services(benchmark):
+    service_conf = {}
+    for i in range(10):
+        service_conf.update(make_service_conf(1_000, f"ns{i}.sub{i}"))
+
+    def conf():
+        ServiceProvider().conf(service_conf, APP_CONF)
+
+    benchmark(conf)
+
+
+def test_service_provider_from_yaml(benchmark, service_conf_files):
+    benchmark(service_provider_from_yaml, service_conf_files[0])
+
+
+@pytest.mark.parametrize("max_workers, processes", [(1, False), (None, False), (None, True)])
+def test_service_provider_from_sources(benchmark, service_conf_files, max_workers, processes):
+    sources = [ServiceDefinitionSource(f"source{i}", path, False) for i, path in enumerate(service_conf_files)]
+
+    benchmark(service_provider_from_sources, *sources, max_workers=max_workers, processes=processes)
+
+
+def test_child_of_10k_services(benchmark):
+    provider = ServiceProvider()
+    provider.conf(make_service_conf(10_000, "ns"), APP_CONF)
+    # Overrides the last service of the chain, which no other depends on.
+    overrides = {"ns.service9999": {"class": "benchmarks.conftest.Service"}}
+
+    benchmark(provider.child, overrides)
@@ -0,0 +1,97 @@
+import importlib.util
+
+import pytest
+
+from pyrovider.services.compiler import compile_provider
+from pyrovider.services.provider import ServiceProvider
+
+from .conftest import APP_CONF, SERVICE, SERVICE_CLASS, make_service_conf
+
+
+def test_get_instance(benchmark, provider):
+    assert benchmark(provider.get, "instance") is SERVICE
+
+
+def test_get_class(benchmark, provider):
+    benchmark(provider.get, "class")
+
+
+def test_get_namespaced_by_key(benchmark, provider):
+    benchmark(provider.get, "a.b.c.d.service")
+
+
+def test_get_namespaced_by_attribute(benchmark, provider):
+    benchmark(lambda: provider.a.b.c.d.service)
+
+
+@pytest.mark.parametrize("kind", ["service", "conf", "env", "import", "list", "literal"])
+def test_get_with_argument(benchmark, provider, kind):
+    benchmark(provider.get, f"arg.{kind}")
+
+
+@pytest.mark.parametrize("depth", [1, 3])
+def test_get_from_parent_provider(benchmark, depth):
+    provider = ServiceProvider(name="provider0")
+    provider.conf({"service": {"instance": "benchmarks.conftest.SERVICE"}})
+    name = "service"
+
+    for i in range(1, depth + 1):
+        provider = ServiceProvider(provider, name=f"provider{i}")
+        provider.conf({})
+        name = f"provider{i - 1}.{name}"
+
+    assert benchmark(provider.get, name) is SERVICE
+
+
+@pytest.mark.parametrize("depth", [10, 100])
+def test_get_dependency_chain(benchmark, depth):
+    provider = ServiceProvider()
+    provider.conf(make_service_conf(depth), APP_CONF)
+
+    benchmark(provider.get, f"service{depth - 1}")
+
+
+@pytest.mark.parametrize("instrumented", [False, True])
+def test_get_instrumented(benchmark, provider, instrumented):
+    if instrumented:
+        provider.instrument()
+
+    benchmark(provider.get, "arg.service")
+
+
+@pytest.mark.parametrize("depth", [10])
+def test_get_dependency_chain_compiled(benchmark, tmp_path, depth):
+    path = tmp_path / "container.py"
+    path.write_text(compile_provider(make_service_conf(depth), APP_CONF))
+    spec = importlib.util.spec_from_file_location("container", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    benchmark(module.provider.get, f"service{depth - 1}")
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_get_many_dependency_chains(benchmark, batched):
+    provider = ServiceProvider()
+    provider.conf(make_service_conf(10), APP_CONF)
+    names = [f"service{i}" for i in range(10)]
+
+    if batched:
+        benchmark(provider.get_many, names)
+    else:
+        benchmark(lambda: {name: provider.get(name) for name in names})
+
+
+@pytest.mark.parametrize("default_scope", ["transient", "graph"])
+def test_get_diamonds(benchmark, default_scope):
+    # Each service depends twice on the one before it: 2 ** depth builds unless shared.
+    service_conf = {"service0": {"class": SERVICE_CLASS}}
+    for i in range(1, 10):
+        service_conf[f"service{i}"] = {
+            "class": SERVICE_CLASS,
+            "arguments": [f"@service{i - 1}", f"@service{i - 1}"],
+        }
+    provider = ServiceProvider(default_scope=default_scope)
+    provider.conf(service_conf)
+
+    benchmark(provider.get, "service9")
@@ -0,0 +1,46 @@
+import tracemalloc
+
+import pytest
+
+from pyrovider.services.provider import ServiceProvider
+
+from .conftest import APP_CONF, make_service_conf
+
+TENANTS = 20
+
+
+def make_tenants(base: ServiceProvider, child: bool) -> list:
+    """Make the tenant providers, as children of `base` or configured from scratch."""
+    tenants = []
+
+    for i in range(TENANTS):
+        # Each tenant has a setting of its own, and a service of its own.
+        overrides = {"ns.service999": {"class": "benchmarks.conftest.Service", "arguments": [i]}}
+        app_overrides = {"app": {"nested": {"a": {"b": {"c": i}}}}}
+
+        if child:
+            tenants.append(base.child(overrides, app_overrides))
+        else:
+            tenant = ServiceProvider()
+            tenant.conf({**base.service_conf, **overrides}, {"app": {**APP_CONF["app"], **app_overrides["app"]}})
+            tenants.append(tenant)
+
+    return tenants
+
+
+@pytest.mark.parametrize("child", [False, True], ids=["conf", "child"])
+def test_memory_per_tenant(benchmark, child):
+    """Time making tenant providers for a conf of 1k services, and report the KB each takes in `extra_info`."""
+    base = ServiceProvider()
+    base.conf(make_service_conf(1_000, "ns"), APP_CONF)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tenants = make_tenants(base, child)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    benchmark.extra_info["kb_per_tenant"] = round((after - before) / len(tenants) / 1024, 2)
+    benchmark(make_tenants, base, child)
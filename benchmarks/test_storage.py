@@ -0,0 +1,51 @@
+"""
+Compares the local storage backends a provider can keep its per-thread state in.
+
+Run with `python -m pytest benchmarks/test_storage.py`.
+"""
+
+import pytest
+
+from pyrovider.services.provider import ServiceProvider
+from pyrovider.services.storage import ContextVarLocalStorage, WerkzeugLocalStorage
+
+BACKENDS = {
+    "contextvars": ContextVarLocalStorage,
+    "werkzeug": WerkzeugLocalStorage,
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def provider(request):
+    if request.param == "werkzeug":
+        pytest.importorskip("werkzeug")
+
+    provider = ServiceProvider(storage=BACKENDS[request.param]())
+    provider.conf({"service": {"instance": "benchmarks.test_storage.SERVICE"}})
+
+    return provider
+
+
+SERVICE = object()
+
+
+def test_get(benchmark, provider):
+    provider.get("service")
+
+    assert benchmark(provider.get, "service") is SERVICE
+
+
+def test_get_after_reset(benchmark, provider):
+    def get_after_reset():
+        provider.reset()
+        return provider.get("service")
+
+    assert benchmark(get_after_reset) is SERVICE
+
+
+def test_set_and_get(benchmark, provider):
+    def set_and_get():
+        provider.set("service", SERVICE)
+        return provider.get("service")
+
+    assert benchmark(set_and_get) is SERVICE
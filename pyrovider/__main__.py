@@ -0,0 +1,37 @@
+import argparse
+import sys
+import typing
+
+from pyrovider.services.compiler import compile_provider
+from pyrovider.tools.yamltools import load_yaml
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyrovider")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser(
+        "compile", help="Generate a Python module with a provider of the services in a YAML conf."
+    )
+    compile_parser.add_argument("service_conf_path", help="The YAML file defining the services.")
+    compile_parser.add_argument("-a", "--app-conf", dest="app_conf_path", help="The YAML file of the app conf.")
+    compile_parser.add_argument("-o", "--output", help="The module to write, instead of printing it.")
+    compile_parser.add_argument("--class-name", default="Container", help="The name of the provider class.")
+
+    args = parser.parse_args(argv)
+
+    service_conf = load_yaml(args.service_conf_path)
+    app_conf = load_yaml(args.app_conf_path) if args.app_conf_path else None
+    source = compile_provider(service_conf, app_conf, class_name=args.class_name, source=args.service_conf_path)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            fp.write(source)
+    else:
+        sys.stdout.write(source)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,55 @@
 import importlib
+import threading
+import typing
 
 from .construction import Singleton
 
 
 class Importer(metaclass=Singleton):
-    @staticmethod
-    def get_obj(class_path: str) -> type:
+    """
+    Gets objects by their path, importing each path only once per process.
+
+    Paths that fail to import are remembered too, and raise the same error again without another import
+    attempt, until `clear()` is called.
+    """
+
+    def __init__(self) -> None:
+        self._objs: typing.Dict[str, typing.Any] = {}
+        self._errors: typing.Dict[str, typing.Tuple[typing.Type[Exception], tuple]] = {}
+        self._lock = threading.Lock()
+
+    def get_obj(self, class_path: str) -> typing.Any:
         """Get a class by its path."""
-        module_parts = class_path.split(".")
-        module_name = ".".join(module_parts[:-1])
+        try:
+            return self._objs[class_path]
+        except KeyError:
+            pass
+
+        if class_path in self._errors:
+            error_class, args = self._errors[class_path]
+            raise error_class(*args)
+
+        # Imports happen outside the lock: the module being imported may need the importer itself.
+        try:
+            obj = self.import_obj(class_path)
+        except (ImportError, KeyError, ValueError) as e:
+            with self._lock:
+                self._errors[class_path] = (type(e), e.args)
+            raise
+
+        with self._lock:
+            return self._objs.setdefault(class_path, obj)
+
+    def clear(self):
+        """Forget every imported object and failed path."""
+        with self._lock:
+            self._objs.clear()
+            self._errors.clear()
+
+    @staticmethod
+    def import_obj(class_path: str) -> typing.Any:
+        """Import an object by its path, without caching it."""
+        module_name, _, obj_name = class_path.rpartition(".")
         module = importlib.import_module(module_name)
 
-        return module.__dict__[module_parts[-1:][0]]
+        return module.__dict__[obj_name]
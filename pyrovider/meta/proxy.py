@@ -0,0 +1,172 @@
+import operator
+import threading
+import typing
+
+_UNBUILT = object()
+
+
+class LazyProxy:
+    """
+    Stands in for the object a factory function returns, calling the function only when the proxy is first used.
+
+    Attribute access, calls, `isinstance` checks, comparison, arithmetic and bitwise operators, numeric
+    conversions, and the container, iteration and context manager protocols, async ones included, are forwarded
+    to the real object. In-place operators rebind the name to the result of the plain operator, rather than
+    updating the real object in place.
+
+    Awaiting and async iteration aren't: defining them would make every proxy look awaitable, or async
+    iterable, to the checks telling those apart. Use `__wrapped__` for those.
+    """
+
+    __slots__ = ("__factory", "__lock", "__obj")
+
+    def __init__(self, factory: typing.Callable[[], typing.Any]):
+        object.__setattr__(self, "_LazyProxy__factory", factory)
+        object.__setattr__(self, "_LazyProxy__lock", threading.Lock())
+        object.__setattr__(self, "_LazyProxy__obj", _UNBUILT)
+
+    def _get_obj(self):
+        obj = self.__obj
+        if obj is _UNBUILT:
+            with self.__lock:
+                obj = self.__obj
+                if obj is _UNBUILT:
+                    obj = self.__factory()
+                    object.__setattr__(self, "_LazyProxy__obj", obj)
+
+        return obj
+
+    @property
+    def __wrapped__(self):
+        return self._get_obj()
+
+    @property  # type: ignore[misc]
+    def __class__(self):
+        return type(self._get_obj())
+
+    def __getattr__(self, name):
+        return getattr(self._get_obj(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get_obj(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._get_obj(), name)
+
+    def __dir__(self):
+        return dir(self._get_obj())
+
+    def __repr__(self):
+        if self.__obj is _UNBUILT:
+            return f"<{type(self).__name__} (unbuilt)>"
+
+        return repr(self.__obj)
+
+    def __str__(self):
+        return str(self._get_obj())
+
+    def __bool__(self):
+        return bool(self._get_obj())
+
+    def __eq__(self, other):
+        return self._get_obj() == other
+
+    def __ne__(self, other):
+        return self._get_obj() != other
+
+    def __hash__(self):
+        return hash(self._get_obj())
+
+    def __call__(self, *args, **kwargs):
+        return self._get_obj()(*args, **kwargs)
+
+    def __len__(self):
+        return len(self._get_obj())
+
+    def __iter__(self):
+        return iter(self._get_obj())
+
+    def __contains__(self, item):
+        return item in self._get_obj()
+
+    def __getitem__(self, key):
+        return self._get_obj()[key]
+
+    def __setitem__(self, key, value):
+        self._get_obj()[key] = value
+
+    def __delitem__(self, key):
+        del self._get_obj()[key]
+
+    def __enter__(self):
+        return self._get_obj().__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._get_obj().__exit__(*exc_info)
+
+    def __reversed__(self):
+        return reversed(self._get_obj())
+
+    def __neg__(self):
+        return -self._get_obj()
+
+    def __pos__(self):
+        return +self._get_obj()
+
+    def __abs__(self):
+        return abs(self._get_obj())
+
+    def __invert__(self):
+        return ~self._get_obj()
+
+    def __int__(self):
+        return int(self._get_obj())
+
+    def __float__(self):
+        return float(self._get_obj())
+
+    def __complex__(self):
+        return complex(self._get_obj())
+
+    def __index__(self):
+        return operator.index(self._get_obj())
+
+    def __round__(self, *args):
+        return round(self._get_obj(), *args)
+
+    def __aenter__(self):
+        return self._get_obj().__aenter__()
+
+    def __aexit__(self, *exc_info):
+        return self._get_obj().__aexit__(*exc_info)
+
+
+def _forward(op: typing.Callable[[typing.Any, typing.Any], typing.Any], reflected: bool = False):
+    if reflected:
+        return lambda self, other: op(other, self._get_obj())
+
+    return lambda self, other: op(self._get_obj(), other)
+
+
+# Comparisons, and binary operators along with their reflected versions, e.g. `1 + proxy`.
+for _name in ("lt", "le", "gt", "ge"):
+    setattr(LazyProxy, f"__{_name}__", _forward(getattr(operator, _name)))
+
+for _name, _op in (
+    ("add", operator.add),
+    ("sub", operator.sub),
+    ("mul", operator.mul),
+    ("matmul", operator.matmul),
+    ("truediv", operator.truediv),
+    ("floordiv", operator.floordiv),
+    ("mod", operator.mod),
+    ("divmod", divmod),
+    ("pow", pow),
+    ("lshift", operator.lshift),
+    ("rshift", operator.rshift),
+    ("and", operator.and_),
+    ("xor", operator.xor),
+    ("or", operator.or_),
+):
+    setattr(LazyProxy, f"__{_name}__", _forward(_op))
+    setattr(LazyProxy, f"__r{_name}__", _forward(_op, reflected=True))
@@ -0,0 +1,129 @@
+import threading
+import typing
+
+from pyrovider.services.env import MISSING, EnvSnapshot
+from pyrovider.services.locks import KeyedLocks
+from pyrovider.services.provider import (
+    BadEnvValueError,
+    NotAServiceFactoryError,
+    ServiceProvider,
+    UnknownServiceError,
+    get_services_and_namespaces,
+)
+from pyrovider.services.storage import ContextVarLocalStorage, LocalStorage
+
+
+class CompiledProvider:
+    """
+    Base class of the providers generated by `python -m pyrovider compile`.
+
+    Generated providers define a method per service, getting it as `ServiceProvider.get` would, and
+    list them in `_getter_names`. Services and namespaces are got, set and reset as with `ServiceProvider`.
+    """
+
+    _getter_names: typing.ClassVar[typing.Dict[str, str]] = {}
+
+    def __init__(
+        self, name: typing.Optional[str] = None, storage: typing.Optional[LocalStorage] = None, dotenv: bool = True
+    ):
+        self.name = name
+        self._getters = {key: getattr(self, getter_name) for key, getter_name in self._getter_names.items()}
+        service_names, self._namespaces = get_services_and_namespaces(self._getter_names, self)
+        self._service_names = dict.fromkeys(service_names)
+        self._singletons: dict = {}
+        self._singletons_lock = threading.Lock()
+        self._singleton_locks = KeyedLocks()
+        self._storage = storage or ContextVarLocalStorage()
+        self._get_state = self._storage.get_state
+        self._env = EnvSnapshot(dotenv=dotenv)
+
+    def reset(self):
+        self._storage.release()
+
+    def refresh_env(self):
+        """Read environment variables again the next time they are needed."""
+        self._env.refresh()
+
+    @property
+    def namespaces(self):
+        return list(self._namespaces.keys())
+
+    @property
+    def service_names(self):
+        return list(self._service_names)
+
+    def __getattr__(self, key):
+        if key in self._namespaces:
+            return self._namespaces[key]
+
+        elif key in self._service_names:
+            return self.get(key)
+
+        raise AttributeError(f"Unknown attribute, service or namespace '{key}'")
+
+    def get(self, name: str, **kwargs):
+        try:
+            getter = self._getters[name]
+        except KeyError:
+            raise UnknownServiceError(ServiceProvider.UNKNOWN_SERVICE_ERRMSG.format(name)) from None
+
+        return getter(**kwargs)
+
+    def set(self, name: str, service: typing.Any):
+        if name not in self._getters:
+            raise UnknownServiceError(ServiceProvider.UNKNOWN_SERVICE_ERRMSG.format(name))
+
+        self._get_state().set_services[name] = service
+
+    def _get_service(self, service_name: str):
+        try:
+            value = self.get(service_name)
+
+        except UnknownServiceError:
+            # See if we are trying to access a service's attribute
+            service_name, service_attr = service_name.rsplit(".", 1)
+            if not service_attr:
+                raise
+
+            service = self.get(service_name)
+            value = getattr(service, service_attr)
+
+        return value
+
+    def _get_singleton(self, name: str, build: typing.Callable[[], typing.Any]):
+        with self._singleton_locks.hold(name):
+            try:
+                return self._singletons[name]
+            except KeyError:
+                pass
+
+            service = build()
+
+            with self._singletons_lock:
+                return self._singletons.setdefault(name, service)
+
+    def _get_env(
+        self,
+        var: str,
+        default: typing.Any = None,
+        env_type: typing.Optional[str] = None,
+        get_default: typing.Optional[typing.Callable[[], typing.Any]] = None,
+    ):
+        value = self._parse_env(var, MISSING, env_type)
+        if value is MISSING:
+            value = self._parse_env(var, default if get_default is None else get_default(), env_type)
+
+        return value
+
+    def _parse_env(self, var: str, value: typing.Any, env_type: typing.Optional[str]):
+        try:
+            return self._env.get(var, env_type) if value is MISSING else self._env.parse(value, env_type)
+        except ValueError as e:
+            raise BadEnvValueError(ServiceProvider.BAD_ENV_VALUE_ERRMSG.format(var, env_type, e)) from e
+
+    @staticmethod
+    def _check_factory(name: str, factory_class: typing.Any):
+        if not hasattr(factory_class, "build") or not callable(factory_class.build):
+            raise NotAServiceFactoryError(ServiceProvider.NOT_A_SERVICE_FACTORY_ERRMSG.format(name))
+
+        return factory_class
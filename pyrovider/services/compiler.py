@@ -0,0 +1,240 @@
+import ast
+import keyword
+import typing
+
+from pyrovider.services.plans import ConfRef, EnvRef, ImportRef, ListOf, Literal, Resolver, ServicePlan, ServiceRef
+from pyrovider.services.provider import ServiceProvider, ServiceProviderError
+
+
+class CompileError(ServiceProviderError):
+    pass
+
+
+def compile_provider(
+    service_conf: dict,
+    app_conf: typing.Optional[dict] = None,
+    class_name: str = "Container",
+    source: typing.Optional[str] = None,
+) -> str:
+    """
+    Generate the source of a module defining a `CompiledProvider` for the given confs, and an instance of it.
+
+    The conf is checked as `ServiceProvider.conf` would check it. Service references become calls to the
+    method getting the referenced service, app conf references become the values they reference, and
+    objects are imported where they are used. Environment variables are still read when services are built.
+    """
+    provider = ServiceProvider()
+    provider.conf(service_conf, app_conf)
+
+    return _ModuleCompiler(provider._plans, class_name, source).compile()
+
+
+class _ModuleCompiler:
+    def __init__(self, plans: typing.Mapping[str, ServicePlan], class_name: str, source: typing.Optional[str]) -> None:
+        self.plans = plans
+        self.class_name = class_name
+        self.source = source
+        self.getter_names = {name: f"_get_{i}" for i, name in enumerate(plans)}
+        # The source of each container value, and the name of the module constant holding it.
+        self.constants: typing.Dict[str, str] = {}
+        self.imports: typing.Set[str] = set()
+
+    def compile(self) -> str:
+        methods = []
+        for name, plan in self.plans.items():
+            methods.extend(self._compile_service(name, plan))
+
+        header = "# Generated by `python -m pyrovider compile`"
+        if self.source is not None:
+            header += f" from {self.source}"
+
+        imports = {
+            "functools": ["import functools", ""],
+            "Importer": ["from pyrovider.meta.ioc import Importer"],
+            "LazyProxy": ["from pyrovider.meta.proxy import LazyProxy"],
+            "_provider": ["from pyrovider.services import provider as _provider"],
+        }
+
+        lines = [
+            f"{header}. Do not edit.",
+            *(line for name, import_lines in imports.items() if name in self.imports for line in import_lines),
+            "from pyrovider.services.compiled import CompiledProvider",
+            "",
+            *(f"{constant} = {source}" for source, constant in self.constants.items()),
+            *([""] if self.constants else []),
+            "",
+            f"class {self.class_name}(CompiledProvider):",
+            "    _getter_names = {",
+            *(f"        {name!r}: {getter_name!r}," for name, getter_name in self.getter_names.items()),
+            "    }",
+            *methods,
+            "",
+            "",
+            f"provider = {self.class_name}()",
+            "",
+        ]
+
+        return "\n".join(lines)
+
+    def _compile_service(self, name: str, plan: ServicePlan) -> typing.List[str]:
+        getter_name = self.getter_names[name]
+        lines = ["", f"    # {name}", f"    def {getter_name}(self, **kwargs):"]
+
+        set_check = [
+            "        state = self._get_state()",
+            f"        if {name!r} in state.set_services:",
+            f"            return state.set_services[{name!r}]",
+        ]
+
+        if plan.error is not None:
+            error = plan.error()
+            self.imports.add("_provider")
+            error_args = ", ".join(repr(arg) for arg in error.args)
+            return [*lines, *set_check, f"        raise _provider.{type(error).__name__}({error_args})"]
+
+        imports: typing.Dict[str, str] = {}
+        target = self._import(plan.path, imports)
+
+        if plan.kind == "instance":
+            return [*lines, *set_check, *self._import_lines(imports, 8), f"        return {target}"]
+
+        build_name = f"{getter_name}_build"
+        args = [self._compile_arg(resolver, imports) for resolver in plan.args]
+        for k, resolver in plan.kwargs:
+            value = f"kwargs.get({k!r}) or {self._compile_arg(resolver, imports)}"
+            args.append(f"{k}={value}" if k.isidentifier() and not keyword.iskeyword(k) else f"**{{{k!r}: {value}}}")
+
+        if plan.kind == "factory":
+            target = f"self._check_factory({name!r}, {target})"
+        if args:
+            call_lines = [f"        return {target}(", *(f"            {arg}," for arg in args), "        )"]
+        else:
+            call_lines = [f"        return {target}()"]
+        if plan.kind == "factory":
+            call_lines[-1] += ".build()"
+
+        build = ["", f"    def {build_name}(self, **kwargs):", *self._import_lines(imports, 8), *call_lines]
+
+        if plan.lazy:
+            scoped_name = f"{getter_name}_scoped"
+            scoped = ["", f"    def {scoped_name}(self, **kwargs):"]
+            if plan.scope == "request":
+                # The proxy is only resolved later, maybe from another thread or task than the one getting it.
+                scoped.append("        state = self._get_state()")
+            scoped.extend(self._scope_lines(name, plan, build_name))
+            self.imports.update(("functools", "LazyProxy"))
+            get = [*lines, *set_check, f"        return LazyProxy(functools.partial(self.{scoped_name}, **kwargs))"]
+
+            return [*get, *scoped, *build]
+
+        return [*lines, *set_check, *self._scope_lines(name, plan, build_name), *build]
+
+    def _scope_lines(self, name: str, plan: ServicePlan, build_name: str) -> typing.List[str]:
+        if plan.scope in ("transient", "graph"):
+            return [f"        return self.{build_name}(**kwargs)"]
+
+        lines = ["        if kwargs:", f"            return self.{build_name}(**kwargs)"]
+
+        if plan.scope == "request":
+            return [
+                *lines,
+                "        scoped_services = state.scoped_services",
+                f"        if {name!r} not in scoped_services:",
+                f"            scoped_services[{name!r}] = self.{build_name}()",
+                f"        return scoped_services[{name!r}]",
+            ]
+
+        return [
+            *lines,
+            "        try:",
+            f"            return self._singletons[{name!r}]",
+            "        except KeyError:",
+            f"            return self._get_singleton({name!r}, self.{build_name})",
+        ]
+
+    def _compile_arg(self, resolver: Resolver, imports: typing.Dict[str, str]) -> str:
+        if isinstance(resolver, Literal):
+            return self._constant(resolver.value)
+
+        elif isinstance(resolver, ServiceRef):
+            return self._compile_service_ref(resolver)
+
+        elif isinstance(resolver, ConfRef):
+            return self._constant(resolver.conf_index[resolver.path])
+
+        elif isinstance(resolver, EnvRef):
+            return self._compile_env_ref(resolver, imports)
+
+        elif isinstance(resolver, ImportRef):
+            return self._import(resolver.path, imports)
+
+        elif isinstance(resolver, ListOf):
+            return f"[{', '.join(self._compile_arg(item, imports) for item in resolver.items)}]"
+
+        raise CompileError(f"Don't know how to compile {resolver!r}.")
+
+    def _compile_service_ref(self, resolver: ServiceRef) -> str:
+        if resolver.name in self.getter_names:
+            return f"self.{self.getter_names[resolver.name]}()"
+
+        service_name, _, service_attr = resolver.name.rpartition(".")
+        if service_name in self.getter_names and service_attr.isidentifier():
+            return f"self.{self.getter_names[service_name]}().{service_attr}"
+
+        # Left for `get()` to fail on, as `ServiceProvider` would.
+        return f"self._get_service({resolver.name!r})"
+
+    def _compile_env_ref(self, resolver: EnvRef, imports: typing.Dict[str, str]) -> str:
+        args = [repr(resolver.var)]
+        if isinstance(resolver.default, Literal):
+            args.append(self._constant(resolver.default.value))
+        if resolver.type is not None:
+            args.append(f"env_type={resolver.type!r}")
+        if resolver.default is not None and not isinstance(resolver.default, Literal):
+            # Other defaults are only resolved when the variable isn't set.
+            args.append(f"get_default=lambda: {self._compile_arg(resolver.default, imports)}")
+
+        return f"self._get_env({', '.join(args)})"
+
+    def _constant(self, value: typing.Any) -> str:
+        """Write a value as a literal, or as a module constant when it's a container, so it is made once."""
+        source = repr(value)
+
+        try:
+            same = ast.literal_eval(source) == value
+        except (ValueError, SyntaxError):
+            same = False
+
+        if not same:
+            raise CompileError(f"The value {source} can't be written as a Python literal.")
+
+        if not isinstance(value, (list, dict, set, tuple)):
+            return source
+
+        if source not in self.constants:
+            self.constants[source] = f"_CONSTANT_{len(self.constants)}"
+
+        return self.constants[source]
+
+    def _import(self, path: str, imports: typing.Dict[str, str]) -> str:
+        """Name the object at a path, to import it within the method being compiled."""
+        module_name, _, obj_name = path.rpartition(".")
+
+        if not module_name or not all(part.isidentifier() and not keyword.iskeyword(part) for part in path.split(".")):
+            # Left for the importer to fail on, as `ServiceProvider` would.
+            self.imports.add("Importer")
+            return f"Importer().get_obj({path!r})"
+
+        if path not in imports:
+            imports[path] = f"_{obj_name}_{len(imports)}"
+
+        return imports[path]
+
+    @staticmethod
+    def _import_lines(imports: typing.Dict[str, str], indent: int) -> typing.List[str]:
+        lines = []
+        for path, alias in imports.items():
+            module_name, _, obj_name = path.rpartition(".")
+            lines.append(f"{' ' * indent}from {module_name} import {obj_name} as {alias}")
+
+        return lines
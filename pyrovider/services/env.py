@@ -0,0 +1,135 @@
+import copy
+import json
+import os
+import typing
+from ast import literal_eval
+
+MISSING = object()
+
+_dotenv_loaded = False
+
+
+def load_dotenv_once():
+    """
+    Load the variables of the `.env` file found by `dotenv.find_dotenv()` into the environment, once per process.
+
+    Variables already set in the environment are left as they are.
+    """
+    global _dotenv_loaded
+
+    if not _dotenv_loaded:
+        # Imported here, as finding the file walks up the filesystem and only providers reading variables need it.
+        from dotenv import find_dotenv, load_dotenv
+
+        load_dotenv(find_dotenv())
+        _dotenv_loaded = True
+
+
+def parse_literal(string: str) -> typing.Any:
+    """Parse a Python literal, or keep the string as it is if it isn't one."""
+    try:
+        if string:
+            return literal_eval(string)
+    except Exception:
+        pass
+
+    return string
+
+
+def parse_bool(string: str) -> bool:
+    value = string.strip().lower()
+
+    if value in ("1", "true", "yes", "on"):
+        return True
+    elif value in ("0", "false", "no", "off", ""):
+        return False
+
+    raise ValueError(f"{string!r} is not a boolean")
+
+
+def parse_list(string: str) -> typing.List[str]:
+    """Parse a comma separated list, or a JSON one."""
+    if string.lstrip().startswith("["):
+        value = json.loads(string)
+        if not isinstance(value, list):
+            raise ValueError(f"{string!r} is not a list")
+
+        return value
+
+    return [item.strip() for item in string.split(",") if item.strip()]
+
+
+ENV_TYPES: typing.Dict[str, typing.Callable[[str], typing.Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": parse_bool,
+    "json": json.loads,
+    "list": parse_list,
+}
+
+
+class EnvSnapshot:
+    """
+    Environment variables, each one read and parsed once until `refresh()` is called.
+
+    Variables with no declared type are parsed as Python literals when possible, and kept as strings otherwise.
+    With `dotenv`, the `.env` file is loaded before the first variable is read. Default values given as strings
+    are parsed once as well, and kept across refreshes, as they don't depend on the environment.
+    """
+
+    def __init__(self, environ: typing.Mapping[str, str] = os.environ, dotenv: bool = False) -> None:
+        self._environ = environ
+        self._values: typing.Dict[typing.Tuple[str, typing.Optional[str]], typing.Any] = {}
+        self._parsed: typing.Dict[typing.Tuple[str, typing.Optional[str]], typing.Any] = {}
+        self._dotenv = dotenv
+
+    def get(self, var: str, type: typing.Optional[str] = None) -> typing.Any:
+        """Get the parsed value of a variable, or `MISSING` when it isn't set."""
+        try:
+            return _copy_mutable(self._values[var, type])
+        except KeyError:
+            pass
+
+        if self._dotenv:
+            load_dotenv_once()
+            self._dotenv = False
+
+        string = self._environ.get(var)
+        value = MISSING if string is None else self._parse(string, type)
+        self._values[var, type] = value
+
+        return _copy_mutable(value)
+
+    def parse(self, value: typing.Any, type: typing.Optional[str] = None) -> typing.Any:
+        """Parse a string as the given type, once per string and type. Anything other than a string is kept as is."""
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return _copy_mutable(self._parsed[value, type])
+        except KeyError:
+            pass
+
+        # Strings that fail to parse aren't kept, so that they fail again.
+        parsed = self._parsed[value, type] = self._parse(value, type)
+
+        return _copy_mutable(parsed)
+
+    @staticmethod
+    def _parse(string: str, type: typing.Optional[str]) -> typing.Any:
+        if type is None:
+            return parse_literal(string)
+
+        return ENV_TYPES[type](string)
+
+    def refresh(self):
+        self._values = {}
+
+
+def _copy_mutable(value: typing.Any) -> typing.Any:
+    """Copy the containers parsed values can be, for each service to get its own, as when parsing them anew."""
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+
+    return value
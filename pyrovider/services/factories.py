@@ -1,16 +1,21 @@
+import glob
+import os
 import typing
-from pathlib import Path
-
-import yaml
 
 from .provider import ServiceProvider
 
+if typing.TYPE_CHECKING:
+    from pathlib import Path
+
 
 def service_provider_from_yaml(
-    service_conf_path: typing.Union[str, Path],
+    service_conf_path: typing.Union[str, "Path"],
     *providers,
-    app_conf_path: typing.Union[str, Path, None] = None,
+    app_conf_path: typing.Union[str, "Path", None] = None,
     name: typing.Optional[str] = None,
+    cache_dir: typing.Union[str, "Path", None] = None,
+    watch: bool = False,
+    watch_interval: float = 1.0,
 ) -> ServiceProvider:
     """Factory method for creating and configuring a ServiceProvider from YAML files.
 
@@ -29,6 +34,13 @@ def service_provider_from_yaml(
             configuration file, typically for application-level settings.
             If None, no application configuration is loaded.
         name: Optional name of the Service Provider.
+        cache_dir: An optional directory where the parsed configuration files
+            are cached, so they are only parsed again when they change.
+        watch: Whether to watch the configuration files, and reconfigure the
+            provider with `ServiceProvider.reconf` when they change. The
+            `ConfWatcher` is kept as the provider's `watcher`.
+        watch_interval: How often, in seconds, the watched files are checked
+            when they can't be watched through inotify.
 
     Returns:
         A `ServiceProvider` instance, configured with the settings from
@@ -40,30 +52,71 @@ def service_provider_from_yaml(
         yaml.YAMLError: If there is an error parsing the YAML content from
             the configuration files.
     """
+    # Imported here, so that importing pyrovider doesn't import PyYAML.
+    from pyrovider.tools.yamltools import load_yaml
+
     provider = ServiceProvider(*providers, name=name)
 
-    with open(service_conf_path) as fp:
-        service_conf = yaml.full_load(fp.read())
+    def load_confs():
+        service_conf = load_yaml(service_conf_path, cache_dir)
+
+        app_conf = load_yaml(app_conf_path, cache_dir) if app_conf_path is not None else None
+
+        return service_conf, app_conf
+
+    if watch:
+        from pyrovider.services.watcher import ConfWatcher
 
-    if app_conf_path is not None:
-        with open(app_conf_path) as fp:
-            app_conf = yaml.full_load(fp.read())
-    else:
-        app_conf = None
+        paths = [os.fspath(path) for path in (service_conf_path, app_conf_path) if path is not None]
+        # Created first, for changes made while the files are loaded to be seen.
+        provider.watcher = ConfWatcher(lambda: paths, lambda: provider.reconf(*load_confs()), watch_interval)
 
-    provider.conf(service_conf, app_conf)
+    provider.conf(*load_confs())
+
+    if provider.watcher is not None:
+        provider.watcher.start()
 
     return provider
 
 
 class ServiceDefinitionSource:
+    """
+    Service definitions to load under a namespace named `name`, or at the root level without `as_namespace`.
+
+    The `path` is a YAML file, a directory whose `.yaml` and `.yml` files are all loaded, or a glob pattern
+    such as `services/**/*.yaml`. The files of a directory or a pattern are loaded in the order of their paths.
+    """
+
     def __init__(self, name, path, as_namespace=True):
         self.name = name
         self.path = path
         self.as_namespace = as_namespace
 
+    def get_paths(self) -> typing.List[str]:
+        path = os.fspath(self.path)
 
-def service_provider_from_sources(*sources: ServiceDefinitionSource, create_alt_names_for_dashes=True):
+        if any(c in path for c in "*?["):
+            paths = sorted(glob.glob(path, recursive=True))
+            if not paths:
+                raise FileNotFoundError(f"No service definition file matches {path}")
+
+            return paths
+
+        elif os.path.isdir(path):
+            return sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith((".yaml", ".yml")))
+
+        return [path]
+
+
+def service_provider_from_sources(
+    *sources: ServiceDefinitionSource,
+    create_alt_names_for_dashes=True,
+    cache_dir: typing.Union[str, "Path", None] = None,
+    max_workers: typing.Optional[int] = None,
+    processes: bool = False,
+    watch: bool = False,
+    watch_interval: float = 1.0,
+):
     """
     Builds a service provider from multiple sources
 
@@ -74,41 +127,115 @@ def service_provider_from_sources(*sources: ServiceDefinitionSource, create_alt_
                   we will create a new one with underscores os if needed it
                   can be accessed as a namespace attribute
 
-    """
-    provider = ServiceProvider()
+      cache_dir: An optional directory where the parsed sources are cached,
+                  so they are only parsed again when they change
 
-    merged_conf = {}
-    errors = []
+      max_workers: How many files are loaded at once, at most
+
+      processes: Load the files in a pool of processes rather than threads,
+                  so that parsing them isn't limited by the GIL, at the cost
+                  of starting the processes and sending the parsed files back
 
+      watch: Watch the files of the sources, files added to their directories
+                  or matching their patterns included, and reconfigure the
+                  provider with `ServiceProvider.reconf` when they change. The
+                  `ConfWatcher` is kept as the provider's `watcher`
+
+      watch_interval: How often, in seconds, the watched files are checked
+                  when they can't be watched through inotify
+
+    Files are loaded concurrently, but merged in the order of the sources, and
+    every entry defined more than once is reported along with the files defining it.
+    """
     for source in sources:
         if not isinstance(source, ServiceDefinitionSource):
             raise TypeError(f"source must be a {ServiceDefinitionSource.__name__} instance")
 
-        with open(source.path) as fp:
-            service_conf = yaml.full_load(fp.read())
+    def load_conf():
+        return _load_sources(sources, create_alt_names_for_dashes, cache_dir, max_workers, processes)
 
-            for key, value in service_conf.items():
-                service_key = f"{source.name}.{key}" if source.as_namespace else key
-                alt_service_key = None
+    provider = ServiceProvider()
+
+    if watch:
+        from pyrovider.services.watcher import ConfWatcher
 
-                # If there was an entry name with dashes
-                # we create an alternate name with dashboards so
-                # it's a valid python attribute name and can be accessed
-                # with dot notation
-                if create_alt_names_for_dashes and "-" in service_key:
-                    alt_service_key = service_key.replace("-", "_")
+        # Created first, for changes made while the files are loaded to be seen.
+        provider.watcher = ConfWatcher(
+            lambda: [path for source in sources for path in source.get_paths()],
+            lambda: provider.reconf(load_conf()),
+            watch_interval,
+        )
 
-                if service_key in merged_conf or alt_service_key in merged_conf:
-                    errors.append(f"Duplicated entry {key} from source ({source.path})")
+    provider.conf(load_conf())
 
-                merged_conf[service_key] = value
+    if provider.watcher is not None:
+        provider.watcher.start()
 
-                if alt_service_key:
-                    merged_conf[alt_service_key] = value
+    return provider
+
+
+def _load_sources(
+    sources: typing.Sequence[ServiceDefinitionSource],
+    create_alt_names_for_dashes: bool,
+    cache_dir: typing.Union[str, "Path", None],
+    max_workers: typing.Optional[int],
+    processes: bool,
+) -> dict:
+    """Load the files of the sources, and merge them into a service conf."""
+    files = [(source, path) for source in sources for path in source.get_paths()]
+    service_confs = _load_files([path for _, path in files], cache_dir, max_workers, processes)
+
+    merged_conf = {}
+    # The file defining each entry, to report duplicates with both files.
+    index: typing.Dict[str, str] = {}
+    errors = []
+
+    for (source, path), service_conf in zip(files, service_confs):
+        for key, value in (service_conf or {}).items():
+            service_key = f"{source.name}.{key}" if source.as_namespace else key
+            alt_service_key = None
+
+            # If there was an entry name with dashes
+            # we create an alternate name with dashboards so
+            # it's a valid python attribute name and can be accessed
+            # with dot notation
+            if create_alt_names_for_dashes and "-" in service_key:
+                alt_service_key = service_key.replace("-", "_")
+
+            for duplicate_key in (service_key, alt_service_key):
+                if duplicate_key in index:
+                    errors.append(
+                        f"Duplicated entry {key} from source ({path}), already defined in ({index[duplicate_key]})"
+                    )
+                    break
+
+            merged_conf[service_key] = value
+            index.setdefault(service_key, path)
+
+            if alt_service_key:
+                merged_conf[alt_service_key] = value
+                index.setdefault(alt_service_key, path)
 
     if errors:
         raise ValueError("\n".join(errors))
 
-    provider.conf(merged_conf)
+    return merged_conf
 
-    return provider
+
+def _load_files(
+    paths: typing.List[str],
+    cache_dir: typing.Union[str, "Path", None],
+    max_workers: typing.Optional[int],
+    processes: bool,
+) -> typing.List[typing.Any]:
+    """Load YAML files concurrently, in the order of their paths."""
+    from pyrovider.tools.yamltools import load_yaml
+
+    if len(paths) < 2 or max_workers == 1:
+        return [load_yaml(path, cache_dir) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers) as executor:
+        return list(executor.map(load_yaml, paths, [cache_dir] * len(paths)))
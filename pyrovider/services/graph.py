@@ -0,0 +1,168 @@
+import typing
+from collections import ChainMap
+
+from pyrovider.services.plans import ServicePlan, ServiceRef
+
+
+class DependencyGraph:
+    """
+    The services each service of a provider needs to be built, as given by its `@` references.
+
+    References to services outside the provider, e.g. from a parent provider, are left out.
+    """
+
+    __slots__ = ("dependencies", "dependents")
+
+    def __init__(self, dependencies: typing.Mapping[str, typing.Iterable[str]]):
+        self.dependencies: typing.MutableMapping[str, typing.Tuple[str, ...]] = {
+            name: tuple(dict.fromkeys(deps)) for name, deps in dependencies.items()
+        }
+        self.dependents: typing.MutableMapping[str, typing.List[str]] = {name: [] for name in self.dependencies}
+
+        for name, deps in self.dependencies.items():
+            for dep in deps:
+                self.dependents[dep].append(name)
+
+    @classmethod
+    def from_plans(cls, plans: typing.Mapping[str, ServicePlan]) -> "DependencyGraph":
+        return cls({name: get_dependencies(plan, plans) for name, plan in plans.items()})
+
+    def derive(self, dependencies: typing.Mapping[str, typing.Iterable[str]]) -> "DependencyGraph":
+        """
+        Get a graph where the given services depend on the given ones instead, or are added.
+
+        The new graph shares everything else with this one, so it costs in proportion to the given services.
+        """
+        own_dependencies = {name: tuple(dict.fromkeys(deps)) for name, deps in dependencies.items()}
+        own_dependents: typing.Dict[str, typing.List[str]] = {}
+
+        def get_dependents(name: str) -> typing.List[str]:
+            if name not in own_dependents:
+                own_dependents[name] = list(self.dependents.get(name, ()))
+
+            return own_dependents[name]
+
+        for name, deps in own_dependencies.items():
+            get_dependents(name)
+            for dep in self.dependencies.get(name, ()):
+                get_dependents(dep).remove(name)
+            for dep in deps:
+                get_dependents(dep).append(name)
+
+        graph = DependencyGraph({})
+        graph.dependencies = ChainMap(own_dependencies, self.dependencies)
+        graph.dependents = ChainMap(own_dependents, self.dependents)
+
+        return graph
+
+    def find_cycle(
+        self, skip: typing.Container[str] = (), roots: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.Optional[typing.List[str]]:
+        """
+        Find a cycle of dependencies, as the list of services in it with the first one repeated at the end.
+
+        Services in `skip` can't be part of a cycle, as depending on them doesn't build them right away.
+        Only cycles reachable from `roots` are looked for, if given.
+        """
+        visiting, done = 1, 2
+        state: typing.Dict[str, int] = {}
+
+        for root in self.dependencies if roots is None else roots:
+            if root in state:
+                continue
+
+            # Iterative depth-first search, to not hit the recursion limit on deep graphs.
+            path = [root]
+            stack = [iter(self.dependencies[root])]
+            state[root] = visiting
+
+            while stack:
+                for dep in stack[-1]:
+                    if dep in skip:
+                        continue
+                    elif state.get(dep) == visiting:
+                        return [*path[path.index(dep) :], dep]
+                    elif dep not in state:
+                        state[dep] = visiting
+                        path.append(dep)
+                        stack.append(iter(self.dependencies[dep]))
+                        break
+                else:
+                    state[path.pop()] = done
+                    stack.pop()
+
+        return None
+
+    def get_closure(self, names: typing.Iterable[str]) -> typing.Set[str]:
+        """Get the given services along with everything they depend on, directly or not."""
+        closure: typing.Set[str] = set()
+        pending = [name for name in names if name in self.dependencies]
+
+        while pending:
+            name = pending.pop()
+            if name not in closure:
+                closure.add(name)
+                pending.extend(self.dependencies[name])
+
+        return closure
+
+    def get_dependents_closure(self, names: typing.Iterable[str]) -> typing.Set[str]:
+        """Get the given services along with everything that depends on them, directly or not."""
+        closure: typing.Set[str] = set()
+        pending = [name for name in names if name in self.dependents]
+
+        while pending:
+            name = pending.pop()
+            if name not in closure:
+                closure.add(name)
+                pending.extend(self.dependents[name])
+
+        return closure
+
+    def get_schedule(
+        self, names: typing.Optional[typing.Iterable[str]] = None, skip: typing.Container[str] = ()
+    ) -> typing.Dict[str, typing.List[str]]:
+        """
+        Get the services each service has to be built after, for the given services, or all of them, and
+        everything they depend on.
+
+        Services in `skip` don't have to be built before the services depending on them.
+        """
+        nodes = self.get_closure(self.dependencies if names is None else names)
+
+        return {name: [dep for dep in self.dependencies[name] if dep in nodes and dep not in skip] for name in nodes}
+
+    def topological_order(
+        self, names: typing.Optional[typing.Iterable[str]] = None, skip: typing.Container[str] = ()
+    ) -> typing.List[str]:
+        """Sort the given services, or all of them, so that each comes after those it depends on."""
+        schedule = self.get_schedule(names, skip)
+        pending = {name: len(deps) for name, deps in schedule.items()}
+        ready = sorted(name for name, count in pending.items() if not count)
+        order = []
+
+        while ready:
+            name = ready.pop()
+            order.append(name)
+
+            for dependent in self.dependents[name]:
+                if dependent in pending and name in schedule[dependent]:
+                    pending[dependent] -= 1
+                    if not pending[dependent]:
+                        ready.append(dependent)
+
+        return order
+
+
+def get_dependencies(plan: ServicePlan, plans: typing.Mapping[str, ServicePlan]) -> typing.List[str]:
+    """Get the services among `plans` that a plan references."""
+    deps = []
+
+    for ref in (resolver.name for resolver in plan.get_resolvers() if isinstance(resolver, ServiceRef)):
+        if ref in plans:
+            deps.append(ref)
+        elif "." in ref and ref.rsplit(".", 1)[0] in plans:
+            # A reference to an attribute of a service
+            deps.append(ref.rsplit(".", 1)[0])
+
+    return deps
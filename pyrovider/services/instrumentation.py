@@ -0,0 +1,176 @@
+import contextlib
+import threading
+import time
+import typing
+from functools import partial
+
+from pyrovider.services.plans import ServicePlan
+
+
+class BuildHook:
+    """Gets called around each service build of an instrumented provider. Override what you need."""
+
+    def before_build(self, name: str):
+        pass
+
+    def after_build(self, name: str, elapsed: float, error: typing.Optional[BaseException]):
+        pass
+
+
+class ServiceStats:
+    """
+    How a service was got from an instrumented provider.
+
+    `source` is where the service is taken from when it isn't built: its scope, or `instance`.
+    Build times include building the service's dependencies.
+    """
+
+    __slots__ = ("builds", "gets", "kind", "max_time", "resolution_hits", "set_hits", "source", "total_time", "warmups")
+
+    def __init__(self, kind: typing.Optional[str], source: str):
+        self.kind = kind
+        self.source = source
+        self.gets = 0
+        self.set_hits = 0
+        self.resolution_hits = 0
+        self.builds = 0
+        self.warmups = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self) -> dict:
+        hits = {"set": self.set_hits}
+        if self.resolution_hits:
+            # Services got again by the `get_many()` or `get()` that built them.
+            hits["resolution"] = self.resolution_hits
+        misses = {}
+
+        if self.kind == "instance":
+            hits["instance"] = self.gets
+        elif self.kind is not None:
+            misses[self.kind] = self.builds
+            if self.source not in ("transient", "graph"):
+                # Services built by a warmup are taken from their scope by every get.
+                hits[self.source] = self.gets - self.builds + self.warmups
+
+        return {
+            "gets": self.gets + self.set_hits + self.resolution_hits,
+            "builds": self.builds,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "hits": hits,
+            "misses": misses,
+        }
+
+
+class Instrumentation:
+    """
+    Counts and times the services an instrumented provider gets and builds, calls the hooks around each
+    build and, given an OpenTelemetry-style tracer, wraps each build in a span.
+    """
+
+    def __init__(self, hooks: typing.Iterable[BuildHook] = (), tracer: typing.Any = None) -> None:
+        self.hooks = list(hooks)
+        self.tracer = tracer
+        self._stats: typing.Dict[str, ServiceStats] = {}
+        self._lock = threading.Lock()
+        # What each instrumented plan got and built its service with, to restore it.
+        self._originals: typing.Dict[str, typing.Tuple[ServicePlan, typing.Tuple[typing.Callable, ...]]] = {}
+
+    def instrument(self, plan: ServicePlan):
+        """Wrap what the plan gets and builds its service with, to count and time it."""
+        if plan.kind is None or self._is_instrumented(plan):
+            return
+
+        self._originals[plan.name] = (plan, (plan.method, plan.getter, plan.builder))
+
+        if plan.kind != "instance":
+            builder = partial(self._build, plan.builder)
+            # Transient services are got with their builder itself.
+            if plan.getter == plan.builder:
+                plan.getter = builder
+            if plan.method == plan.builder:
+                plan.method = builder
+            plan.builder = builder
+
+        plan.method = partial(self._get, plan.method)
+
+    def restore(self, plan: ServicePlan):
+        """Undo `instrument()`."""
+        if self._is_instrumented(plan):
+            plan.method, plan.getter, plan.builder = self._originals.pop(plan.name)[1]
+
+    def _is_instrumented(self, plan: ServicePlan) -> bool:
+        entry = self._originals.get(plan.name)
+
+        return entry is not None and entry[0] is plan
+
+    def _get_stats(self, plan: ServicePlan) -> ServiceStats:
+        stats = self._stats.get(plan.name)
+        if stats is None:
+            stats = self._stats.setdefault(plan.name, ServiceStats(plan.kind, plan.scope))
+
+        return stats
+
+    def record_get(self, plan: ServicePlan):
+        stats = self._get_stats(plan)
+        with self._lock:
+            stats.gets += 1
+
+    def record_set_hit(self, plan: ServicePlan):
+        stats = self._get_stats(plan)
+        with self._lock:
+            stats.set_hits += 1
+
+    def record_warmup(self, plan: ServicePlan):
+        stats = self._get_stats(plan)
+        with self._lock:
+            stats.warmups += 1
+
+    def record_resolution_hit(self, plan: ServicePlan):
+        stats = self._get_stats(plan)
+        with self._lock:
+            stats.resolution_hits += 1
+
+    def record_build(self, plan: ServicePlan, elapsed: float):
+        stats = self._get_stats(plan)
+        with self._lock:
+            stats.builds += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
+    def _get(self, method: typing.Callable, plan: ServicePlan, **kwargs):
+        self.record_get(plan)
+
+        return method(plan, **kwargs)
+
+    def _build(self, builder: typing.Callable, plan: ServicePlan, **kwargs):
+        with self.measure(plan):
+            return builder(plan, **kwargs)
+
+    @contextlib.contextmanager
+    def measure(self, plan: ServicePlan):
+        """Time a build of the plan's service, calling the hooks and tracing it."""
+        for hook in self.hooks:
+            hook.before_build(plan.name)
+
+        span = self.tracer.start_as_current_span(f"build {plan.name}") if self.tracer else contextlib.nullcontext()
+        error = None
+        start = time.perf_counter()
+
+        try:
+            with span:
+                yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record_build(plan, elapsed)
+
+            for hook in self.hooks:
+                hook.after_build(plan.name, elapsed, error)
+
+    def stats(self) -> typing.Dict[str, dict]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,70 @@
+import contextlib
+import threading
+import typing
+
+
+class KeyedLocks:
+    """
+    A reentrant lock per key, so that threads building different services don't wait for each other.
+
+    A thread is never made to wait for a key held by a thread that is itself waiting, directly or through
+    others, for a key the first thread holds. `hold()` yields False instead of locking then, and the caller
+    goes on without the lock rather than deadlocking.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._locks: typing.Dict[typing.Hashable, threading.RLock] = {}
+        # The thread holding each key and how many times it did, and the key each waiting thread waits for.
+        self._owners: typing.Dict[typing.Hashable, typing.List[int]] = {}
+        self._waiting: typing.Dict[int, typing.Hashable] = {}
+
+    @contextlib.contextmanager
+    def hold(self, key: typing.Hashable) -> typing.Iterator[bool]:
+        me = threading.get_ident()
+
+        with self._lock:
+            if self._would_deadlock(key, me):
+                lock = None
+            else:
+                lock = self._locks.setdefault(key, threading.RLock())
+                self._waiting[me] = key
+
+        if lock is None:
+            yield False
+            return
+
+        lock.acquire()
+        with self._lock:
+            del self._waiting[me]
+            owner = self._owners.setdefault(key, [me, 0])
+            owner[1] += 1
+
+        try:
+            yield True
+        finally:
+            with self._lock:
+                owner[1] -= 1
+                if not owner[1]:
+                    del self._owners[key]
+
+            lock.release()
+
+    def _would_deadlock(self, key: typing.Hashable, me: int) -> bool:
+        owner = self._owners.get(key)
+        if owner is None or owner[0] == me:
+            return False
+
+        seen = set()
+        while owner is not None and owner[0] not in seen:
+            seen.add(owner[0])
+            if owner[0] == me:
+                return True
+
+            waited = self._waiting.get(owner[0])
+            if waited is None:
+                return False
+
+            owner = self._owners.get(waited)
+
+        return False
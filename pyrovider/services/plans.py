@@ -0,0 +1,233 @@
+import typing
+
+from pyrovider.services.env import MISSING
+
+
+class Resolver:
+    """
+    Resolves one argument of a service definition, as compiled by `ServiceProvider.conf`.
+
+    Resolvers that reference services are `awaitable`, and can be resolved with `aresolve` for `ServiceProvider.aget`.
+    """
+
+    __slots__ = ()
+
+    awaitable = False
+
+    def __call__(self) -> typing.Any:
+        raise NotImplementedError()
+
+    async def aresolve(self) -> typing.Any:
+        return self()
+
+
+async def aresolve_all(resolvers: typing.Sequence[Resolver]) -> typing.List[typing.Any]:
+    """Resolve the given resolvers, running those that reference services concurrently."""
+    values = [None if resolver.awaitable else resolver() for resolver in resolvers]
+    pending = [i for i, resolver in enumerate(resolvers) if resolver.awaitable]
+
+    if len(pending) == 1:
+        values[pending[0]] = await resolvers[pending[0]].aresolve()
+    elif pending:
+        import asyncio
+
+        for i, value in zip(pending, await asyncio.gather(*(resolvers[i].aresolve() for i in pending))):
+            values[i] = value
+
+    return values
+
+
+class Literal(Resolver):
+    """A value used as is."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: typing.Any):
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+
+class ServiceRef(Resolver):
+    """An `@service` reference, or `@service.attribute`."""
+
+    __slots__ = ("name", "provider")
+
+    awaitable = True
+
+    def __init__(self, provider, name: str):
+        self.provider = provider
+        self.name = name
+
+    def __call__(self):
+        return self.provider._get_service(self.name)
+
+    async def aresolve(self):
+        return await self.provider._aget_service(self.name)
+
+
+class ConfRef(Resolver):
+    """
+    A `%path.in.app.conf%` reference.
+
+    It looks the path up in the index of the app conf it was compiled with, so that services keep getting
+    the values of that conf while `ServiceProvider.reconf` swaps in another one.
+    """
+
+    __slots__ = ("conf_index", "path", "provider")
+
+    def __init__(self, provider, path: str, conf_index: typing.Mapping[str, typing.Any]):
+        self.provider = provider
+        self.path = path
+        self.conf_index = conf_index
+
+    def __call__(self):
+        return self.provider._get_conf(self.path, self.conf_index)
+
+
+class EnvRef(Resolver):
+    """A `$VAR` reference, or `[$VAR, default]`, or `[$VAR, default, type]`."""
+
+    __slots__ = ("awaitable", "default", "provider", "type", "var")
+
+    def __init__(
+        self, provider, var: str, default: typing.Optional[Resolver] = None, type: typing.Optional[str] = None
+    ):
+        self.provider = provider
+        self.var = var
+        self.default = default
+        self.type = type
+        self.awaitable = default is not None and default.awaitable
+
+    def __call__(self):
+        return self.provider._get_env(self.var, self.default, self.type)
+
+    async def aresolve(self):
+        value = self.provider._parse_env(self.var, MISSING, self.type)
+        if value is MISSING:
+            default = None if self.default is None else await self.default.aresolve()
+            value = self.provider._parse_env(self.var, default, self.type)
+
+        return value
+
+
+class ImportRef(Resolver):
+    """A `^module.object` reference."""
+
+    __slots__ = ("importer", "path")
+
+    def __init__(self, importer, path: str):
+        self.importer = importer
+        self.path = path
+
+    def __call__(self):
+        return self.importer.get_obj(self.path)
+
+
+class ListOf(Resolver):
+    """A list of arguments, each one resolved on its own."""
+
+    __slots__ = ("awaitable", "items")
+
+    def __init__(self, items: typing.Sequence[Resolver]):
+        self.items = tuple(items)
+        self.awaitable = any(item.awaitable for item in self.items)
+
+    def __call__(self):
+        return [item() for item in self.items]
+
+    async def aresolve(self):
+        return await aresolve_all(self.items)
+
+
+def walk(resolvers: typing.Iterable[Resolver]) -> typing.Iterator[Resolver]:
+    """Yield the given resolvers, and those nested within them."""
+    for resolver in resolvers:
+        yield resolver
+
+        if isinstance(resolver, ListOf):
+            yield from walk(resolver.items)
+        elif isinstance(resolver, EnvRef) and resolver.default is not None:
+            yield from walk((resolver.default,))
+
+
+def _raise_error(plan: "ServicePlan", **kwargs):
+    raise plan.error()  # type: ignore[misc]
+
+
+class ServicePlan:
+    """
+    Everything `ServiceProvider.get` needs to build a service, worked out once from its definition.
+
+    `builder` makes a new object of the service, `getter` is the builder itself or a wrapper that caches
+    its result according to the service's `scope`, and `method` is what `get` calls: the getter, or for
+    `lazy` services, a wrapper that hands out a proxy calling the getter on first use.
+
+    `pool` holds the options of the pool `ServiceProvider.lease` checks objects of the service out of,
+    for services defined with one.
+
+    `graph` is set on services of the `graph` scope and on those depending on them, directly or not, so that
+    getting them builds each `graph` service they depend on once.
+
+    `preload` services are built by `ServiceProvider.prefork_warmup` before worker processes are forked, and
+    `fork_unsafe` ones, and those depending on them, dropped by `ServiceProvider.after_fork` in each worker.
+
+    A definition that can't be built keeps the error it would raise in `error`, and its `method`
+    raises it, so the error surfaces when the service is requested rather than when the conf is loaded.
+    """
+
+    __slots__ = (
+        "args",
+        "builder",
+        "error",
+        "fork_unsafe",
+        "getter",
+        "graph",
+        "kind",
+        "kwargs",
+        "lazy",
+        "method",
+        "name",
+        "path",
+        "pool",
+        "preload",
+        "scope",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: typing.Optional[str] = None,
+        path: str = "",
+        method: typing.Optional[typing.Callable] = None,
+        builder: typing.Optional[typing.Callable] = None,
+        getter: typing.Optional[typing.Callable] = None,
+        scope: str = "transient",
+        lazy: bool = False,
+        args: typing.Sequence[Resolver] = (),
+        kwargs: typing.Sequence[typing.Tuple[str, Resolver]] = (),
+        error: typing.Optional[typing.Callable[[], Exception]] = None,
+        pool: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        preload: bool = False,
+        fork_unsafe: bool = False,
+    ):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.builder: typing.Callable[..., typing.Any] = builder or _raise_error
+        self.getter: typing.Callable[..., typing.Any] = getter or self.builder
+        self.method: typing.Callable[..., typing.Any] = method or self.getter
+        self.scope = scope
+        self.lazy = lazy
+        self.args = tuple(args)
+        self.kwargs = tuple(kwargs)
+        self.error = error
+        self.pool = pool
+        self.preload = preload
+        self.fork_unsafe = fork_unsafe
+        self.graph = False
+
+    def get_resolvers(self) -> typing.Iterator[Resolver]:
+        """Yield the resolvers of every argument, and those nested within them."""
+        return walk((*self.args, *(resolver for _, resolver in self.kwargs)))
@@ -0,0 +1,166 @@
+import collections
+import threading
+import time
+import typing
+
+
+class Pool:
+    """
+    A bounded pool of objects made by `create`, checked out with `acquire()` and back in with `release()`.
+
+    At most `max_size` objects exist at once, handed out or idle. Idle objects are reused most recently
+    released first, and those idle for longer than `idle_timeout` seconds are dropped, down to `min_idle`.
+    When given, `validate` is called with each idle object before handing it out again, and objects it
+    returns false for are dropped. Dropped objects are closed, if they have a `close()` method.
+
+    Once the pool is closed, objects checked back in are dropped, and none can be checked out.
+    """
+
+    def __init__(
+        self,
+        create: typing.Callable[[], typing.Any],
+        max_size: int = 10,
+        min_idle: int = 0,
+        idle_timeout: typing.Optional[float] = None,
+        validate: typing.Optional[typing.Callable[[typing.Any], bool]] = None,
+    ) -> None:
+        if max_size < 1 or not 0 <= min_idle <= max_size:
+            raise ValueError(f"Bad pool sizes: max_size={max_size}, min_idle={min_idle}")
+
+        self.create = create
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self.validate = validate
+        self._idle: typing.Deque[typing.Tuple[typing.Any, float]] = collections.deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, timeout: typing.Optional[float] = None) -> typing.Any:
+        """Check an object out, waiting up to `timeout` seconds for one, or forever, when the pool is full."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            obj, create, evicted = self._take(deadline)
+
+            try:
+                self._close_all(evicted)
+
+                if create:
+                    return self.create()
+
+                if self.validate is None or self.validate(obj):
+                    return obj
+            except BaseException:
+                # Whatever failed, the object, or the place taken for a new one, mustn't be lost for good.
+                if create:
+                    self._forget()
+                else:
+                    self.discard(obj)
+                raise
+
+            self.discard(obj)
+
+    def _take(self, deadline: typing.Optional[float]) -> typing.Tuple[typing.Any, bool, typing.List[typing.Any]]:
+        """Take an idle object, or a place for a new one, along with the objects evicted meanwhile."""
+        evicted = []
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The pool is closed.")
+
+                evicted.extend(self._evict())
+
+                if self._idle:
+                    return self._idle.pop()[0], False, evicted
+                elif self._size < self.max_size:
+                    self._size += 1
+                    return None, True, evicted
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No object was released within the timeout, out of {self.max_size}")
+
+                self._condition.wait(remaining)
+
+    def release(self, obj: typing.Any):
+        """Check an object back in, or drop it if the pool was closed meanwhile."""
+        with self._condition:
+            if not self._closed:
+                self._idle.append((obj, time.monotonic()))
+                self._condition.notify()
+                return
+
+            self._size -= 1
+
+        self._close_all([obj])
+
+    def discard(self, obj: typing.Any):
+        """Drop a checked out object rather than checking it back in, making room for a new one."""
+        self._forget()
+        self._close_all([obj])
+
+    def _forget(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def fill(self):
+        """Create objects until `min_idle` of them are idle, or the pool is full."""
+        while True:
+            with self._condition:
+                if self._closed or len(self._idle) >= self.min_idle or self._size >= self.max_size:
+                    return
+
+                self._size += 1
+
+            try:
+                obj = self.create()
+            except BaseException:
+                self._forget()
+                raise
+
+            self.release(obj)
+
+    def close(self):
+        """Drop every idle object, and those checked out once they're checked back in."""
+        with self._condition:
+            self._closed = True
+            objs = [obj for obj, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(objs)
+            self._condition.notify_all()
+
+        self._close_all(objs)
+
+    def _evict(self) -> typing.List[typing.Any]:
+        """Drop the objects idle for too long. Must be called with the condition held."""
+        if self.idle_timeout is None:
+            return []
+
+        evicted = []
+        expiry = time.monotonic() - self.idle_timeout
+
+        # The oldest objects are at the left.
+        while len(self._idle) > self.min_idle and self._idle[0][1] < expiry:
+            evicted.append(self._idle.popleft()[0])
+            self._size -= 1
+
+        return evicted
+
+    @staticmethod
+    def _close_all(objs: typing.Iterable[typing.Any]):
+        for obj in objs:
+            close = getattr(obj, "close", None)
+            if callable(close):
+                close()
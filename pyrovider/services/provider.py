@@ -1,20 +1,35 @@
-import os
+import contextlib
+import threading
 import typing
-from ast import literal_eval
-from collections import defaultdict
-
-from dotenv import find_dotenv, load_dotenv
+import weakref
+from collections import ChainMap, defaultdict
+from functools import partial
 
 from pyrovider.meta.ioc import Importer
-from pyrovider.tools.dicttools import dictpath
-
-try:
-    from werkzeug.local import Local, release_local
-except ImportError:
-    from werkzeug import Local, release_local  # type: ignore[attr-defined,no-redef]
-
-# Loads env vars from .env file
-load_dotenv(find_dotenv())
+from pyrovider.meta.proxy import LazyProxy
+from pyrovider.services.env import ENV_TYPES, MISSING, EnvSnapshot
+from pyrovider.services.graph import DependencyGraph, get_dependencies
+from pyrovider.services.instrumentation import BuildHook, Instrumentation
+from pyrovider.services.locks import KeyedLocks
+from pyrovider.services.plans import (
+    ConfRef,
+    EnvRef,
+    ImportRef,
+    ListOf,
+    Literal,
+    Resolver,
+    ServicePlan,
+    ServiceRef,
+    aresolve_all,
+)
+from pyrovider.services.pool import Pool
+from pyrovider.services.storage import ContextVarLocalStorage, LocalState, LocalStorage, Resolution
+from pyrovider.tools.dicttools import dictflatten, dictoverlay
+
+if typing.TYPE_CHECKING:
+    import asyncio
+
+    from pyrovider.services.watcher import ConfWatcher
 
 
 class ServiceProviderError(Exception):
@@ -41,58 +56,115 @@ class BadConfPathError(ServiceProviderError):
     pass
 
 
+class UnknownScopeError(ServiceProviderError):
+    pass
+
+
+class CircularDependencyError(ServiceProviderError):
+    pass
+
+
+class UnknownEnvTypeError(ServiceProviderError):
+    pass
+
+
+class BadEnvValueError(ServiceProviderError):
+    pass
+
+
+class BadPoolOptionsError(ServiceProviderError):
+    pass
+
+
+class NotAPooledServiceError(ServiceProviderError):
+    pass
+
+
+class PoolExhaustedError(ServiceProviderError):
+    pass
+
+
+class AsyncFactoryError(ServiceProviderError):
+    pass
+
+
 class ServiceFactory:
     def build(self):
         raise NotImplementedError()
 
 
 def get_services_and_namespaces(services_names: typing.Iterable[str], provider, parent_namespace=None):
+    """
+    Sort service names into those at the top level and the tree of namespaces holding the rest.
+
+    Each name is split once, and each namespace is built once, knowing its path and the full key of its services.
+    """
     services = []
-    namespaces = {}
-    namespace_map = defaultdict(list)
+    namespaces: typing.Dict[str, Namespace] = {}
+    prefix = f"{parent_namespace.path}." if parent_namespace is not None else ""
 
     for key in services_names:
-        parts = key.split(".")
-        namespace = parts[0] if len(parts) > 1 else None
-        service_name = ".".join(parts[1:])
-        if namespace:
-            namespace_map[namespace].append(service_name)
-        else:
+        if "." not in key:
             services.append(key)
-    for namespace, namespace_service_names in namespace_map.items():
-        namespaces[namespace] = Namespace(namespace, namespace_service_names, provider, parent=parent_namespace)
+            continue
+
+        *path, service_name = key.split(".")
+        parent, children = parent_namespace, namespaces
+
+        for name in path:
+            namespace = children.get(name)
+            if namespace is None:
+                namespace = children[name] = Namespace(name, (), provider, parent=parent)
+
+            parent, children = namespace, namespace._namespaces
+
+        parent._service_keys[service_name] = prefix + key
 
     return services, namespaces
 
 
 class Namespace:
-    def __init__(self, name, services_names, provider, parent=None):
+    __slots__ = ("_namespaces", "_service_keys", "name", "parent", "path", "provider")
+
+    def __init__(self, name, services_names, provider, parent=None) -> None:
         self.name = name
         self.parent = parent
         self.provider = provider
+        self.path = f"{parent.path}.{name}" if parent else name
+        self._namespaces: typing.Dict[str, Namespace] = {}
+        self._service_keys: typing.Dict[str, str] = {}
 
         services, namespaces = get_services_and_namespaces(services_names, provider, parent_namespace=self)
-        self._service_names = services
-        self._namespaces = namespaces
+        self._namespaces.update(namespaces)
+        for service in services:
+            self._service_keys[service] = f"{self.path}.{service}"
 
     def __getattr__(self, key):
         if key in self._namespaces:
             return self._namespaces[key]
 
-        elif key in self._service_names:
-            return self.get(key)
+        elif key in self._service_keys:
+            return self.provider.get(self._service_keys[key])
 
         raise AttributeError(f"Unknown attribute or service '{key}'")
 
-    @property
-    def path(self):
-        return f"{self.parent.path}.{self.name}" if self.parent else self.name
+    def _get_key(self, name: str) -> str:
+        return self._service_keys.get(name) or f"{self.path}.{name}"
 
     def get(self, name, **kwargs):
-        return self.provider.get(f"{self.path}.{name}", **kwargs)
+        return self.provider.get(self._get_key(name), **kwargs)
+
+    async def aget(self, name, **kwargs):
+        return await self.provider.aget(self._get_key(name), **kwargs)
+
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        names = list(names)
+        services = self.provider.get_many([self._get_key(name) for name in names])
+
+        return {name: services[self._get_key(name)] for name in names}
 
     def set(self, name: str, service: typing.Any):
-        return self.provider.set(f"{self.path}.{name}", service)
+        return self.provider.set(self._get_key(name), service)
 
     @property
     def namespaces(self):
@@ -100,12 +172,10 @@ class Namespace:
 
     @property
     def service_names(self):
-        return self._service_names
+        return list(self._service_keys)
 
 
 class ServiceProvider:
-    name = None
-
     UNKNOWN_SERVICE_ERRMSG = '"{}" is not a service we know of.'
     TOO_MANY_CREATION_METHODS_ERRMSG = (
         'You must define either a class, an instance, or a factory for the service "{}", not both.'
@@ -115,6 +185,15 @@ class ServiceProvider:
     )
     NOT_A_SERVICE_FACTORY_ERRMSG = 'The factory class for the service "{}" does not have a "build" method.'
     BAD_CONF_PATH_ERRMSG = 'The path "{}" was not found in the app configuration.'
+    UNKNOWN_SCOPE_ERRMSG = 'The scope "{}" of the service "{}" is not one of: {}.'
+    CIRCULAR_DEPENDENCY_ERRMSG = "The services depend on each other in a circle: {}."
+    UNKNOWN_ENV_TYPE_ERRMSG = 'The type "{}" of the environment variable "{}" is not one of: {}.'
+    BAD_ENV_VALUE_ERRMSG = 'The environment variable "{}" is not a valid "{}": {}'
+    BAD_POOL_OPTIONS_ERRMSG = 'The pool of the service "{}" must be a mapping of some of: {}.'
+    BAD_POOL_SIZES_ERRMSG = 'The pool of the service "{}" can\'t be made: {}'
+    NOT_A_POOLED_SERVICE_ERRMSG = 'The service "{}" has no pool to lease it from.'
+    POOL_EXHAUSTED_ERRMSG = 'No object of the service "{}" was released within {} seconds.'
+    ASYNC_FACTORY_ERRMSG = 'The factory of the service "{}" builds it asynchronously: get it with "aget()" instead.'
 
     _service_meths: typing.ClassVar[typing.Dict[str, str]] = {
         "instance": "_get_service_instance",
@@ -122,44 +201,335 @@ class ServiceProvider:
         "factory": "_instance_service_with_factory",
     }
 
-    def __init__(self, *providers, name: typing.Optional[str] = None):
-        self.name = name
+    # Services are built on every `get()` unless their `scope` says otherwise: `graph` services are built
+    # once for everything a `get()` builds, `singleton` services are shared by the whole process, `request`
+    # services are kept until `reset()`. Services marked `lazy` are handed out as proxies, and only built
+    # (or taken from their scope) when first used.
+    _scope_meths: typing.ClassVar[typing.Dict[str, typing.Optional[str]]] = {
+        "transient": None,
+        "graph": None,
+        "request": "_get_request_service",
+        "singleton": "_get_singleton_service",
+    }
+
+    # The scopes of the services `get_many()` builds once for all the services it gets.
+    _batch_scopes: typing.ClassVar[typing.FrozenSet[str]] = frozenset(("transient", "graph"))
+    _graph_scopes: typing.ClassVar[typing.FrozenSet[str]] = frozenset(("graph",))
+
+    # Options of the `pool` of a service, those `lease()` checks objects of the service out of.
+    _pool_options: typing.ClassVar[typing.Tuple[str, ...]] = ("max_size", "min_idle", "idle_timeout", "validate")
+
+    def __init__(
+        self,
+        *providers,
+        name: typing.Optional[str] = None,
+        storage: typing.Optional[LocalStorage] = None,
+        default_scope: str = "transient",
+        dotenv: bool = True,
+    ):
+        # Services of parent providers are found through a table mapping every name reachable through them
+        # to the provider owning the service and its key there, built on first use and dropped whenever
+        # a parent is reconfigured or renamed.
+        self._routes: typing.Optional[typing.Dict[str, typing.Tuple[ServiceProvider, str]]] = None
+        # Only made for providers that are parents of others.
+        self._children: typing.Optional[weakref.WeakSet] = None
+        self._name = name
         self._providers = providers
+        for p in providers:
+            if p._children is None:
+                p._children = weakref.WeakSet()
+            p._children.add(self)
         self.importer = Importer()  # Can't inject it, obviously.
-        self.service_conf: dict = {}
+        self.service_conf: typing.MutableMapping[str, typing.Any] = {}
         self.app_conf: dict = {}
-        self.service_instances: dict = {}
-        self.service_classes: dict = {}
-        self.factory_classes: dict = {}
-        self._namespaces: dict = {}
-        self._service_names: list = []
-        self._local = Local()
-
-    def _init_local(self):
-        if not hasattr(self._local, "set_services"):
-            self._local.set_services = {}
-            self._local.service_instances = {}
-            self._local.service_classes = {}
-            self._local.factory_classes = {}
+        # `%path%` references are looked up in an index of every node of the app conf by its dotted path.
+        self._conf_index: typing.MutableMapping[str, typing.Any] = {}
+        # The services referencing each app conf path, worked out for the first `child()` overriding the app conf.
+        self._conf_refs: typing.Optional[typing.Dict[str, typing.List[str]]] = None
+        # Only worked out on first use by children.
+        self._namespaces: typing.Optional[typing.Dict[str, Namespace]] = {}
+        self._service_names: typing.MutableMapping[str, None] = {}
+        self._plans: typing.MutableMapping[str, ServicePlan] = {}
+        # The plans this provider compiled: all of them, unless it's a `child()` sharing the others with its base.
+        self._own_plans: typing.Dict[str, ServicePlan] = {}
+        self._base: typing.Optional[ServiceProvider] = None
+        # The services set in children or their bases whose dependents children compiled plans of their own for.
+        self._set_names_owned: typing.Set[str] = set()
+        self.dependency_graph = DependencyGraph({})
+        # Services with no `scope` of their own get this one: `singleton` makes the provider build each
+        # service once, and share it between all threads, and `graph` builds each once per `get()`.
+        self.default_scope = default_scope
+        self._singletons: dict = {}
+        self._singletons_lock = threading.RLock()
+        # Each singleton is built under a lock of its own, so that threads getting it at the same time
+        # build it once, without waiting on threads building other singletons.
+        self._singleton_locks = KeyedLocks()
+        self._pools: typing.Dict[str, Pool] = {}
+        self._pools_lock = threading.Lock()
+        self._reconf_lock = threading.Lock()
+        # Singletons `aget()` is building, by event loop, as their futures can only be awaited in their own.
+        self._singletons_building: typing.Dict[typing.Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+        # Services set with `set()` and those with a `request` scope are kept per thread or asyncio task.
+        self._storage = storage or ContextVarLocalStorage()
+        self._get_state = self._storage.get_state
+        # Environment variables are read and parsed once, until `refresh_env()` is called. Unless `dotenv`
+        # is false, the `.env` file is loaded when the first one is read.
+        self._env = EnvSnapshot(dotenv=dotenv)
+        # Only set while instrumented, so that uninstrumented providers don't pay for it.
+        self._instrumentation: typing.Optional[Instrumentation] = None
+        # Set by the factories for providers reconfigured as their files change.
+        self.watcher: typing.Optional[ConfWatcher] = None
 
     def reset(self):
-        release_local(self._local)
+        self._storage.release()
 
         for p in self._providers:
             p.reset()
 
+        if self._base is not None:
+            # The request services of the base are those of its children too.
+            self._base.reset()
+
+    def refresh_env(self):
+        """Read environment variables again the next time they are needed."""
+        self._env.refresh()
+
+        for p in self._providers:
+            p.refresh_env()
+
     def conf(self, service_conf: dict, app_conf: typing.Optional[dict] = None):
         if app_conf is None:
             app_conf = {}
 
         self.service_conf = service_conf
         self.app_conf = app_conf
+        self._conf_index = dictflatten(app_conf)
         self.name = service_conf.get("__name__") or self.name
+        self._invalidate_routes()
 
         service_names, namespaces = get_services_and_namespaces(service_conf.keys(), self)
 
-        self._service_names = service_names
+        self._service_names = dict.fromkeys(service_names)
         self._namespaces = namespaces
+        self._plans = self._own_plans = {
+            name: self._compile(name, definition, self._conf_index) for name, definition in service_conf.items()
+        }
+        self._base = None
+        self._conf_refs = None
+        self._singletons = {}
+        self._close_pools()
+        self.dependency_graph = DependencyGraph.from_plans(self._plans)
+        self._mark_graph_plans(self._plans, self.dependency_graph)
+        self._check_conf(self._plans, self.dependency_graph, namespaces)
+
+    def reconf(self, service_conf: dict, app_conf: typing.Optional[dict] = None) -> typing.Set[str]:
+        """
+        Configure the provider again, only dropping what the changes to its confs affect.
+
+        The services whose definition changed, those referencing app conf values that changed, and everything
+        depending on them are invalidated: they are compiled again, and their singletons and pools dropped.
+        Other services keep theirs. The new confs are checked as `conf()` checks them, and swapped in at once,
+        so `get()` never waits on it, and gets services from either conf, never from a mix of them. If the
+        check fails, the provider is left as it was. Request services are kept until `reset()`.
+
+        Returns the names of the invalidated services, along with those of added and removed services.
+        """
+        if app_conf is None:
+            app_conf = {}
+
+        with self._reconf_lock:
+            conf_index = dictflatten(app_conf)
+            old_plans, old_graph = self._plans, self.dependency_graph
+
+            changed = {
+                name
+                for name in (*service_conf, *old_plans)
+                if service_conf.get(name, MISSING) != self.service_conf.get(name, MISSING)
+            }
+            for name, plan in old_plans.items():
+                for resolver in plan.get_resolvers():
+                    if isinstance(resolver, ConfRef) and conf_index.get(resolver.path, MISSING) != resolver():
+                        changed.add(name)
+
+            # Children compile the plans they share with their base again, as those are the base's.
+            plans = {
+                name: old_plans[name]
+                if name not in changed and name in self._own_plans
+                else self._compile(name, definition, conf_index)
+                for name, definition in service_conf.items()
+            }
+            graph = DependencyGraph.from_plans(plans)
+            invalidated = graph.get_dependents_closure(changed) | old_graph.get_dependents_closure(changed)
+
+            # Dependents get plans of their own, so that whatever is built from their old ones isn't kept.
+            for name in invalidated - changed:
+                if name in plans:
+                    plans[name] = self._compile(name, service_conf[name], conf_index)
+
+            self._mark_graph_plans(plans, graph)
+            service_names, namespaces = get_services_and_namespaces(service_conf.keys(), self)
+            self._check_conf(plans, graph, namespaces)
+
+            self.service_conf = service_conf
+            self.app_conf = app_conf
+            self._conf_index = conf_index
+            self.name = service_conf.get("__name__") or self.name
+            self._service_names = dict.fromkeys(service_names)
+            self._namespaces = namespaces
+            self.dependency_graph = graph
+            # Swapped along with the plans, for singletons built from old plans not to be stored.
+            with self._singletons_lock:
+                self._singletons = {name: s for name, s in self._singletons.items() if name not in invalidated}
+                self._plans = self._own_plans = plans
+                self._base = None
+                self._conf_refs = None
+
+            self._invalidate_routes()
+
+            with self._pools_lock:
+                pools = [self._pools.pop(name) for name in invalidated if name in self._pools]
+
+            for pool in pools:
+                pool.close()
+
+        return invalidated
+
+    def child(
+        self,
+        overrides: typing.Optional[dict] = None,
+        app_overrides: typing.Optional[dict] = None,
+        storage: typing.Optional[LocalStorage] = None,
+    ) -> "ServiceProvider":
+        """
+        Derive a provider where the given service definitions replace, or add to, those of this one.
+
+        `app_overrides` are merged into the app conf of the child, dictionaries within them into those of
+        the app conf, as for a tenant's own settings. The services referencing values they change are
+        affected as the overridden ones are.
+
+        Only the affected services and those depending on them, directly or not, are compiled for the child,
+        and built and cached by it. It shares everything else with this provider: plans, singletons, request
+        services, pools, locks, environment variables, and the app conf nodes it doesn't override. So deriving
+        a child costs in proportion to the services and settings it overrides, rather than to the whole conf,
+        both in time and memory.
+
+        Services set with `set()` in the child are its own, and those set in this provider aren't the child's.
+        The first time the child finds a service set in either, it compiles plans of its own for the services
+        depending on it, which then get their dependencies from the child, and no longer share singletons with
+        this provider.
+
+        Children keep the conf this provider had when they were derived, so they should be derived again
+        after it's reconfigured. Services of this provider referencing names it doesn't know keep getting them
+        as it does, even if the child defines them.
+        """
+        overrides = overrides or {}
+
+        child = ServiceProvider(*self._providers, name=self.name, storage=storage, default_scope=self.default_scope)
+        child.importer = self.importer
+        child._env = self._env
+        child._singletons_lock = self._singletons_lock
+        child._singleton_locks = self._singleton_locks
+        child._pools_lock = self._pools_lock
+        child._reconf_lock = self._reconf_lock
+        child._base = self
+        child.service_conf = ChainMap(overrides, self.service_conf)
+        child.app_conf = self.app_conf
+        child._conf_index = self._conf_index
+
+        conf_affected: typing.Set[str] = set()
+        if app_overrides:
+            child.app_conf, changed, removed = dictoverlay(self.app_conf, app_overrides)
+            # Removed paths are masked, for the child not to find them in the index of this provider.
+            child._conf_index = ChainMap({**dict.fromkeys(removed, MISSING), **changed}, self._conf_index)
+            conf_refs = self._get_conf_refs()
+            for path in (*changed, *removed):
+                conf_affected.update(conf_refs.get(path, ()))
+
+        added = [name for name in overrides if name not in self._plans]
+        added_names, _ = get_services_and_namespaces(added, child)
+        child._service_names = self._service_names
+        if added_names:
+            child._service_names = ChainMap(dict.fromkeys(added_names), self._service_names)
+        child._namespaces = None
+
+        affected = self.dependency_graph.get_dependents_closure({*overrides, *conf_affected}) | set(overrides)
+        child._own_plans = {
+            name: child._compile(name, child.service_conf[name], child._conf_index) for name in affected
+        }
+        child._plans = ChainMap(child._own_plans, self._plans)
+        child.dependency_graph = self.dependency_graph.derive(
+            {name: get_dependencies(plan, child._plans) for name, plan in child._own_plans.items()}
+        )
+        self._mark_graph_plans(child._plans, child.dependency_graph, child._own_plans)
+        child._check_conf(
+            child._plans, child.dependency_graph, {name.split(".", 1)[0] for name in added if "." in name}, affected
+        )
+
+        return child
+
+    def _get_child_plan(self, plan: ServicePlan, state: LocalState) -> ServicePlan:
+        """
+        Get the plan a child follows for a service it shares with its base, given the services set in it.
+
+        Shared plans get their dependencies from the base, and with them the services set in the base rather
+        than in the child. So the first time a service is found set in the child, or in its bases, those
+        depending on it are compiled for the child, and get their dependencies from it from then on.
+        """
+        names = set(state.set_services)
+        base = self._base
+        while base is not None:
+            names.update(base._get_state().set_services)
+            base = base._base
+
+        names -= self._set_names_owned
+        if not names:
+            return plan
+
+        with self._reconf_lock:
+            graph = self.dependency_graph
+            dependents = graph.get_dependents_closure(dep for name in names for dep in graph.dependents.get(name, ()))
+            new_plans = {
+                name: self._compile(name, self.service_conf[name], self._conf_index)
+                for name in dependents
+                if name not in self._own_plans
+            }
+            self._own_plans.update(new_plans)
+            self._mark_graph_plans(self._plans, graph, new_plans)
+            self._set_names_owned.update(names)
+
+        return self._plans[plan.name]
+
+    def _get_conf_refs(self) -> typing.Dict[str, typing.List[str]]:
+        """Get the names of the services referencing each app conf path."""
+        if self._conf_refs is None:
+            conf_refs: typing.Dict[str, typing.List[str]] = {}
+            for name, plan in self._plans.items():
+                for resolver in plan.get_resolvers():
+                    if isinstance(resolver, ConfRef):
+                        conf_refs.setdefault(resolver.path, []).append(name)
+
+            self._conf_refs = conf_refs
+
+        return self._conf_refs
+
+    def _check_conf(
+        self,
+        plans: typing.Mapping[str, ServicePlan],
+        graph: DependencyGraph,
+        namespaces: typing.Iterable[str],
+        roots: typing.Optional[typing.Collection[str]] = None,
+    ):
+        """Check the plans, or those of `roots` and what they depend on, as `conf()` checks them."""
+        for name in plans if roots is None else roots:
+            for resolver in plans[name].get_resolvers():
+                if isinstance(resolver, ConfRef) and resolver.conf_index.get(resolver.path, MISSING) is MISSING:
+                    missing_key = self._get_missing_conf_key(resolver.path, resolver.conf_index)
+                    raise BadConfPathError(self.BAD_CONF_PATH_ERRMSG.format(missing_key))
+
+        names = plans if roots is None else graph.get_closure(roots)
+        cycle = graph.find_cycle(skip={name for name in names if plans[name].lazy}, roots=roots)
+        if cycle:
+            raise CircularDependencyError(self.CIRCULAR_DEPENDENCY_ERRMSG.format(" -> ".join(cycle)))
 
         errors = []
         for ns in namespaces:
@@ -173,30 +543,316 @@ class ServiceProvider:
         if errors:
             raise ValueError("\n".join(errors))
 
+    def warmup(self, names: typing.Optional[typing.Iterable[str]] = None, max_workers: typing.Optional[int] = None):
+        """
+        Build the singleton and instance services among the given ones, or all of them, and their dependencies.
+
+        Services are built after those they depend on, with those that don't depend on each other built
+        in parallel by up to `max_workers` threads.
+        """
+        if names is not None:
+            names = list(names)
+            for name in names:
+                if name not in self._plans:
+                    raise UnknownServiceError(self.UNKNOWN_SERVICE_ERRMSG.format(name))
+
+        schedule = self.dependency_graph.get_schedule(
+            names, skip={name for name, plan in self._plans.items() if plan.lazy}
+        )
+        self._run_schedule(schedule, self._warmup_service, max_workers)
+
+    def _run_schedule(
+        self, schedule: typing.Dict[str, typing.List[str]], func: typing.Callable, max_workers: typing.Optional[int]
+    ):
+        pending = {name: len(deps) for name, deps in schedule.items()}
+        dependents = defaultdict(list)
+        for name, deps in schedule.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        # Imported here, as most processes importing the provider never warm it up.
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {executor.submit(func, self._plans[name]): name for name, count in pending.items() if not count}
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = futures.pop(future)
+
+                    if future.exception() is not None:
+                        for pending_future in futures:
+                            pending_future.cancel()
+
+                        raise future.exception()  # type: ignore[misc]
+
+                    for dependent in dependents[name]:
+                        pending[dependent] -= 1
+                        if not pending[dependent]:
+                            futures[executor.submit(func, self._plans[dependent])] = dependent
+
+    def _warmup_service(self, plan: ServicePlan):
+        owner = self._get_owner(plan)
+        if owner is not self:
+            return owner._warmup_service(plan)
+
+        if plan.kind == "instance":
+            plan.builder(plan)
+
+        elif plan.scope == "singleton" and plan.name not in self._singletons:
+            with self._singleton_locks.hold(plan.name):
+                if plan.name in self._singletons:
+                    return
+
+                service = plan.builder(plan)
+
+                self._store_singleton(plan, service)
+
+            if self._instrumentation is not None:
+                self._instrumentation.record_warmup(plan)
+
+        if plan.pool is not None and plan.error is None:
+            self._get_pool(plan).fill()
+
+    def prefork_warmup(self, max_workers: typing.Optional[int] = None):
+        """
+        Get this provider and its parents ready for a pre-forking server, e.g. gunicorn with `preload_app`.
+
+        Every class, factory, `^` reference and pool `validate` path is imported, and the services marked
+        `preload` warmed up, so that worker processes share them with the master process through copy-on-write
+        instead of each importing and building them on its first requests. Workers should then call `after_fork()`.
+        """
+        for p in self._providers:
+            p.prefork_warmup(max_workers)
+
+        for plan in self._plans.values():
+            if plan.error is not None:
+                continue
+
+            self.importer.get_obj(plan.path)
+
+            for resolver in plan.get_resolvers():
+                if isinstance(resolver, ImportRef):
+                    resolver()
+
+            validate = (plan.pool or {}).get("validate")
+            if isinstance(validate, str):
+                self.importer.get_obj(validate)
+
+        self.warmup([name for name, plan in self._plans.items() if plan.preload], max_workers)
+
+    def after_fork(self) -> typing.Set[str]:
+        """
+        Drop what this provider and its parents built before the process was forked and can't share with it.
+
+        Singletons and pools of the services marked `fork_unsafe`, such as those holding sockets, threads or
+        connections, and of those depending on them, are dropped without being closed, as they are still
+        the parent process'. Those marked `preload` are built again. Call it in each forked process, e.g. from
+        gunicorn's `post_fork` hook, or register it with `os.register_at_fork(after_in_child=...)`.
+
+        Providers watching their conf files start watching them again, as threads don't survive the fork.
+
+        Returns the names of the dropped services.
+        """
+        for p in self._providers:
+            p.after_fork()
+
+        if self.watcher is not None:
+            self.watcher.after_fork()
+
+        dropped = self.dependency_graph.get_dependents_closure(
+            name for name, plan in self._plans.items() if plan.fork_unsafe
+        )
+        if not dropped:
+            return dropped
+
+        with self._singletons_lock:
+            self._singletons = {name: s for name, s in self._singletons.items() if name not in dropped}
+
+        with self._pools_lock:
+            for name in dropped:
+                self._pools.pop(name, None)
+
+        preload = [name for name in dropped if self._plans[name].preload]
+        if preload:
+            self.warmup(preload)
+
+        return dropped
+
+    @contextlib.contextmanager
+    def lease(self, name: str, timeout: typing.Optional[float] = None) -> typing.Iterator[typing.Any]:
+        """
+        Check an object of a service with a `pool` out of it, and back in once done with it.
+
+        Objects are built like `get()` would build the service, but only up to the `max_size` of the pool.
+        When they are all leased, this waits up to `timeout` seconds, or forever, for one to be released.
+        """
+        plan = self._plans.get(name)
+        if plan is None:
+            provider, service_key = self._get_route(name)
+            with provider.lease(service_key, timeout) as obj:
+                yield obj
+
+            return
+
+        pool = self._get_pool(plan)
+        try:
+            obj = pool.acquire(timeout)
+        except TimeoutError:
+            raise PoolExhaustedError(self.POOL_EXHAUSTED_ERRMSG.format(name, timeout)) from None
+
+        try:
+            yield obj
+        finally:
+            pool.release(obj)
+
+    def _get_pool(self, plan: ServicePlan) -> Pool:
+        try:
+            return self._pools[plan.name]
+        except KeyError:
+            pass
+
+        owner = self._get_owner(plan)
+        if owner is not self:
+            return owner._get_pool(plan)
+
+        if plan.error is not None:
+            raise plan.error()
+        elif plan.pool is None:
+            raise NotAPooledServiceError(self.NOT_A_POOLED_SERVICE_ERRMSG.format(plan.name))
+
+        options = dict(plan.pool)
+        validate = options.pop("validate", None)
+        if isinstance(validate, str):
+            validate = self.importer.get_obj(validate)
+
+        with self._pools_lock:
+            if plan.name not in self._pools:
+                try:
+                    self._pools[plan.name] = Pool(partial(plan.builder, plan), validate=validate, **options)
+                except (TypeError, ValueError) as e:
+                    raise BadPoolOptionsError(self.BAD_POOL_SIZES_ERRMSG.format(plan.name, e)) from e
+
+            return self._pools[plan.name]
+
+    def _get_owner(self, plan: ServicePlan) -> "ServiceProvider":
+        """Get the provider that compiled a plan: this one, or for children, the base they share it with."""
+        provider = self
+        while provider._base is not None and provider._own_plans.get(plan.name) is not plan:
+            provider = provider._base
+
+        return provider
+
+    def _close_pools(self):
+        with self._pools_lock:
+            pools, self._pools = self._pools, {}
+
+        for pool in pools.values():
+            pool.close()
+
+    def instrument(self, *hooks: BuildHook, tracer: typing.Any = None) -> Instrumentation:
+        """
+        Count and time every service this provider gets and builds from now on, as reported by `stats()`.
+
+        The hooks are called around each build, and given a tracer such as OpenTelemetry's, each build
+        is wrapped in a span. Instrumenting again replaces the hooks, tracer and statistics.
+        """
+        self.uninstrument()
+
+        self._instrumentation = Instrumentation(hooks, tracer)
+        for plan in self._own_plans.values():
+            self._instrumentation.instrument(plan)
+
+        return self._instrumentation
+
+    def uninstrument(self):
+        if self._instrumentation is not None:
+            for plan in self._own_plans.values():
+                self._instrumentation.restore(plan)
+
+            self._instrumentation = None
+
+    def stats(self) -> typing.Dict[str, dict]:
+        """
+        How many times each service was got and built since the provider was instrumented, how long
+        its builds took in total and at most, and where it was taken from: `hits` by the `set`, `instance`
+        or scope it was found in, and `misses` by the `class` or `factory` it was built with.
+        """
+        if self._instrumentation is None:
+            return {}
+
+        return self._instrumentation.stats()
+
+    @property
+    def name(self) -> typing.Optional[str]:
+        return self._name
+
+    @name.setter
+    def name(self, name: typing.Optional[str]):
+        self._name = name
+        self._invalidate_routes()
+
+    def _invalidate_routes(self):
+        for child in list(self._children or ()):
+            child._routes = None
+            child._invalidate_routes()
+
+    def _get_routes(self) -> typing.Dict[str, typing.Tuple["ServiceProvider", str]]:
+        routes = self._routes
+        if routes is None:
+            routes = {}
+
+            for p in self._providers:
+                if p.name is None:
+                    continue
+
+                prefix = f"{p.name}."
+                for key in p._plans:
+                    routes.setdefault(prefix + key, (p, key))
+
+                for key, route in p._get_routes().items():
+                    routes.setdefault(prefix + key, route)
+
+            self._routes = routes
+
+        return routes
+
+    def _get_route(self, name: str) -> typing.Tuple["ServiceProvider", str]:
+        try:
+            return (self._routes if self._routes is not None else self._get_routes())[name]
+        except KeyError:
+            raise UnknownServiceError(self.UNKNOWN_SERVICE_ERRMSG.format(name)) from None
+
     @property
     def namespaces(self):
-        return list(self._namespaces.keys()) + [p.name for p in self._providers]
+        return list(self._get_namespaces().keys()) + [p.name for p in self._providers]
+
+    def _get_namespaces(self) -> typing.Dict[str, Namespace]:
+        if self._namespaces is None:
+            _, self._namespaces = get_services_and_namespaces(self.service_conf.keys(), self)
+
+        return self._namespaces
 
     @property
     def service_names(self):
-        return self._service_names
+        return list(self._service_names)
 
     def __getattr__(self, key):
-        if key in self._namespaces:
-            return self._namespaces[key]
+        namespaces = self._get_namespaces()
+        if key in namespaces:
+            return namespaces[key]
 
         elif key in self._service_names:
             return self.get(key)
 
         elif "." in key:
             # a service from a parent provider might have been requested
-            service_key = ".".join(key.split(".")[1:])
-            try:
-                for p in self._providers:
-                    return getattr(p, service_key)
+            if key in self._get_routes():
+                provider, service_key = self._get_routes()[key]
+                return provider.get(service_key)
 
-            except AttributeError:
-                pass
         else:
             # a provider might be referenced by its name
             for p in self._providers:
@@ -206,104 +862,369 @@ class ServiceProvider:
         raise AttributeError(f"Unknown attribute, service or namespace '{key}'")
 
     def get(self, name: str, **kwargs):
-        self._init_local()
+        plan = self._plans.get(name)
+        if plan is None:
+            provider, service_key = self._get_route(name)
+            return provider.get(service_key, **kwargs)
 
-        if name not in self.service_conf:
-            if "." in name:
-                parent = name.split(".")[0]
-                service_key = ".".join(name.split(".")[1:])
+        state = self._get_state()
+        if name in state.set_services:
+            if self._instrumentation is not None:
+                self._instrumentation.record_set_hit(plan)
 
-                for p in self._providers:
-                    if parent == p.name:
-                        return p.get(service_key, **kwargs)
+            return state.set_services[name]
 
-            raise UnknownServiceError(self.UNKNOWN_SERVICE_ERRMSG.format(name))
+        if self._base is not None and self._own_plans.get(name) is not plan:
+            plan = self._get_child_plan(plan, state)
 
-        return self._get_set_service(name) or self._get_built_service(name, **kwargs)
+        resolution = state.resolution
+        if resolution is not None:
+            if not kwargs and plan.scope in resolution.scopes:
+                return self._get_resolved_service(plan, resolution)
+
+        elif plan.graph:
+            state.resolution = Resolution(self._graph_scopes)
+            try:
+                return self._get_built_service(plan, **kwargs)
+            finally:
+                state.resolution = None
 
-    def _get_set_service(self, name: str):
-        if name in self._local.set_services:
-            return self._local.set_services[name]
+        return self._get_built_service(plan, **kwargs)
 
-    def _get_built_service(self, name: str, **kwargs):
-        if self.service_conf[name] and self._has_multiple_creation_methods(name):
-            raise TooManyCreationMethodsError(self.TOO_MANY_CREATION_METHODS_ERRMSG.format(name))
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        """
+        Get several services by their names, building each service they depend on at most once for all of them.
+
+        Transient and `graph` services are shared by the services depending on them, and only by them: getting
+        them again afterwards builds them again.
+        """
+        state = self._get_state()
+        if state.resolution is not None:
+            # Services got while getting others share their resolution.
+            return {name: self.get(name) for name in names}
+
+        state.resolution = Resolution(self._batch_scopes)
+        try:
+            return {name: self.get(name) for name in names}
+        finally:
+            state.resolution = None
 
-        for service_type, method in self._service_meths.items():
-            if self.service_conf[name] and service_type in self.service_conf[name]:
-                return getattr(self, method)(name, **kwargs)
+    def _get_resolved_service(self, plan: ServicePlan, resolution: Resolution):
+        try:
+            service = resolution.services[plan.name]
+        except KeyError:
+            service = resolution.services[plan.name] = self._get_built_service(plan)
         else:
-            raise NoCreationMethodError(self.NO_CREATION_METHOD_ERRMSG.format(name))
+            if self._instrumentation is not None:
+                self._instrumentation.record_resolution_hit(plan)
 
-    def set(self, name: str, service: typing.Any):
-        self._init_local()
+        return service
 
-        if name not in self.service_conf:
-            raise UnknownServiceError(self.UNKNOWN_SERVICE_ERRMSG.format(name))
+    async def aget(self, name: str, **kwargs):
+        """
+        Get a service like `get()` does, awaiting factories whose `build` is a coroutine.
 
-        self._local.set_services[name] = service
+        The `@` references among the arguments of a service are resolved concurrently.
+        """
+        plan = self._plans.get(name)
+        if plan is None:
+            provider, service_key = self._get_route(name)
+            return await provider.aget(service_key, **kwargs)
 
-    def _has_multiple_creation_methods(self, name: str):
-        if not self.service_conf[name]:
-            raise NoCreationMethodError(self.NO_CREATION_METHOD_ERRMSG.format(name))
+        set_services = self._get_state().set_services
+        if name in set_services:
+            if self._instrumentation is not None:
+                self._instrumentation.record_set_hit(plan)
 
-        return len([k for k in self._service_meths if k in self.service_conf[name]]) > 1
+            return set_services[name]
 
-    def _get_service_instance(self, name: str):
-        if name not in self._local.service_instances:
-            self._local.service_instances[name] = self.importer.get_obj(self.service_conf[name]["instance"])
+        if self._base is not None and self._own_plans.get(name) is not plan:
+            plan = self._get_child_plan(plan, self._get_state())
 
-        return self._local.service_instances[name]
+        return await self._aget_built_service(plan, **kwargs)
 
-    def _instance_service_with_class(self, name: str, **kwargs):
-        if name not in self._local.service_classes:
-            self._local.service_classes[name] = self.importer.get_obj(self.service_conf[name]["class"])
+    def _get_built_service(self, plan: ServicePlan, **kwargs):
+        return plan.method(plan, **kwargs)
 
-        return self._local.service_classes[name](*self._get_args(name), **self._get_kwargs(name, **kwargs))
+    async def _aget_built_service(self, plan: ServicePlan, **kwargs):
+        owner = self._get_owner(plan)
+        if owner is not self:
+            # Plans a child shares with its base are built, and their services kept, by the base.
+            return await owner._aget_built_service(plan, **kwargs)
 
-    def _instance_service_with_factory(self, name: str, **kwargs):
-        if name not in self._local.factory_classes:
-            factory_class = self.importer.get_obj(self.service_conf[name]["factory"])
+        if plan.lazy or plan.kind == "instance" or plan.error is not None:
+            return plan.method(plan, **kwargs)
 
-            if not hasattr(factory_class, "build") or not callable(factory_class.build):
-                raise NotAServiceFactoryError(self.NOT_A_SERVICE_FACTORY_ERRMSG.format(name))
+        if self._instrumentation is not None:
+            self._instrumentation.record_get(plan)
 
-            self._local.factory_classes[name] = factory_class
+        if kwargs or plan.scope in ("transient", "graph"):
+            return await self._abuild(plan, **kwargs)
 
-        return self._local.factory_classes[name](*self._get_args(name), **self._get_kwargs(name, **kwargs)).build()
+        elif plan.scope == "request":
+            scoped_services = self._get_state().scoped_services
+            if plan.name not in scoped_services:
+                scoped_services[plan.name] = await self._abuild(plan)
 
-    def _get_args(self, name: str):
-        if "arguments" in self.service_conf[name]:
-            return [self._get_arg(ref) for ref in self.service_conf[name]["arguments"]]
-        else:
-            return []
+            return scoped_services[plan.name]
+
+        if plan.name in self._singletons:
+            return self._singletons[plan.name]
+
+        import asyncio
+
+        # Concurrent requests for a singleton that is still being built wait for the same build. Those from
+        # other event loops build it too, and get whichever build was stored first.
+        key = (asyncio.get_running_loop(), plan.name)
+        building = self._singletons_building.get(key)
+        if building is None:
+            building = asyncio.ensure_future(self._abuild_singleton(plan, key))
+            self._singletons_building[key] = building
+
+        return await asyncio.shield(building)
+
+    async def _abuild_singleton(self, plan: ServicePlan, key: typing.Tuple["asyncio.AbstractEventLoop", str]):
+        try:
+            return self._store_singleton(plan, await self._abuild(plan))
+        finally:
+            self._singletons_building.pop(key, None)
+
+    async def _abuild(self, plan: ServicePlan, **kwargs):
+        if self._instrumentation is None:
+            return await self._abuild_service(plan, **kwargs)
+
+        with self._instrumentation.measure(plan):
+            return await self._abuild_service(plan, **kwargs)
+
+    async def _abuild_service(self, plan: ServicePlan, **kwargs):
+        target = self.importer.get_obj(plan.path)
+
+        if plan.kind == "factory" and (not hasattr(target, "build") or not callable(target.build)):
+            raise NotAServiceFactoryError(self.NOT_A_SERVICE_FACTORY_ERRMSG.format(plan.name))
+
+        args = await aresolve_all(plan.args)
+        values = iter(await aresolve_all([resolver for k, resolver in plan.kwargs if not kwargs.get(k)]))
+        named_args = {k: kwargs.get(k) or next(values) for k, _ in plan.kwargs}
+
+        if plan.kind == "class":
+            return target(*args, **named_args)
+
+        service = target(*args, **named_args).build()
+
+        import inspect
+
+        # Only coroutines are awaited: services may be awaitable themselves, and lazy proxies stay unbuilt.
+        if not isinstance(service, LazyProxy) and inspect.iscoroutine(service):
+            service = await service
+
+        return service
+
+    def set(self, name: str, service: typing.Any):
+        if name not in self._plans:
+            raise UnknownServiceError(self.UNKNOWN_SERVICE_ERRMSG.format(name))
+
+        self._get_state().set_services[name] = service
+
+    @staticmethod
+    def _mark_graph_plans(
+        plans: typing.Mapping[str, ServicePlan],
+        graph: DependencyGraph,
+        names: typing.Optional[typing.Iterable[str]] = None,
+    ):
+        """
+        Mark the plans of `graph` services and of everything depending on them, for `get()` to share them.
+
+        With `names`, only those plans are marked, knowing whether they depend on any `graph` service.
+        """
+        if names is None:
+            graph_names = [name for name, plan in plans.items() if plan.scope == "graph"]
+
+            for name in graph.get_dependents_closure(graph_names):
+                plans[name].graph = True
 
-    def _get_kwargs(self, name: str, **kwargs):
-        named_arguments = {}
+            return
 
-        for k, v in self.service_conf[name].get("named_arguments", {}).items():
-            named_arguments[k] = kwargs.get(k) or self._get_arg(v)
+        for name in names:
+            plans[name].graph = any(plans[dep].scope == "graph" for dep in graph.get_closure((name,)))
 
-        return named_arguments
+    def _compile(self, name: str, definition: typing.Any, conf_index: typing.Mapping[str, typing.Any]) -> ServicePlan:
+        """Turn a service definition into the plan `get` follows to build it."""
+        if not isinstance(definition, dict) or not definition:
+            return ServicePlan(name, error=partial(NoCreationMethodError, self.NO_CREATION_METHOD_ERRMSG.format(name)))
 
-    def _get_arg(self, ref: typing.Any):
-        if isinstance(ref, str):
+        kinds = [k for k in self._service_meths if k in definition]
+
+        if len(kinds) > 1:
+            return ServicePlan(
+                name, error=partial(TooManyCreationMethodsError, self.TOO_MANY_CREATION_METHODS_ERRMSG.format(name))
+            )
+        elif not kinds:
+            return ServicePlan(name, error=partial(NoCreationMethodError, self.NO_CREATION_METHOD_ERRMSG.format(name)))
+
+        kind = kinds[0]
+        scope = definition.get("scope", self.default_scope)
+
+        if scope not in self._scope_meths:
+            return ServicePlan(
+                name,
+                error=partial(
+                    UnknownScopeError, self.UNKNOWN_SCOPE_ERRMSG.format(scope, name, ", ".join(self._scope_meths))
+                ),
+            )
+
+        try:
+            args = [self._compile_arg(ref, conf_index) for ref in definition.get("arguments") or ()]
+            named_arguments = definition.get("named_arguments") or {}
+            kwargs = [(k, self._compile_arg(v, conf_index)) for k, v in named_arguments.items()]
+            pool = self._compile_pool(name, kind, definition.get("pool"))
+        except ServiceProviderError as e:
+            return ServicePlan(name, error=partial(type(e), *e.args))
+
+        plan = ServicePlan(
+            name,
+            kind=kind,
+            path=definition[kind],
+            builder=getattr(self, self._service_meths[kind]),
+            getter=getattr(self, self._scope_meths[scope] or self._service_meths[kind]),
+            method=self._get_lazy_service if definition.get("lazy") else None,
+            scope=scope,
+            lazy=bool(definition.get("lazy")),
+            args=args,
+            kwargs=kwargs,
+            pool=pool,
+            preload=bool(definition.get("preload")),
+            fork_unsafe=bool(definition.get("fork_unsafe")),
+        )
+
+        if self._instrumentation is not None:
+            self._instrumentation.instrument(plan)
+
+        return plan
+
+    def _compile_pool(self, name: str, kind: str, options: typing.Any) -> typing.Optional[dict]:
+        if options is None:
+            return None
+        elif kind == "instance" or not isinstance(options, dict) or not set(options) <= set(self._pool_options):
+            raise BadPoolOptionsError(self.BAD_POOL_OPTIONS_ERRMSG.format(name, ", ".join(self._pool_options)))
+
+        return options
+
+    def _compile_arg(self, ref: typing.Any, conf_index: typing.Mapping[str, typing.Any]) -> Resolver:
+        if isinstance(ref, str) and ref:
             if ref[0] == "@":
-                return self._get_service(ref[1:])
+                return ServiceRef(self, ref[1:])
             elif "%" == ref[0] == ref[-1:]:
-                return self._get_conf(ref[1:-1])
+                return ConfRef(self, ref[1:-1], conf_index)
             elif ref[0] == "$":
-                return self._get_env(ref[1:])
+                return EnvRef(self, ref[1:])
             elif ref[0] == "^":
-                return self.importer.get_obj(ref[1:])
+                return ImportRef(self.importer, ref[1:])
 
         elif isinstance(ref, list):
-            if ref[0][0] == "$":
-                return self._get_env(ref[0][1:], ref[1])
+            if ref and isinstance(ref[0], str) and ref[0][:1] == "$":
+                # [$VAR, default, type]
+                env_type = ref[2] if len(ref) > 2 else None
+                if env_type is not None and env_type not in ENV_TYPES:
+                    raise UnknownEnvTypeError(
+                        self.UNKNOWN_ENV_TYPE_ERRMSG.format(env_type, ref[0][1:], ", ".join(ENV_TYPES))
+                    )
+
+                default = self._compile_arg(ref[1] if len(ref) > 1 else None, conf_index)
+                return EnvRef(self, ref[0][1:], default, env_type)
             else:
-                return [self._get_arg(i) for i in ref]
+                return ListOf([self._compile_arg(i, conf_index) for i in ref])
+
+        return Literal(ref)
+
+    def _get_lazy_service(self, plan: ServicePlan, **kwargs):
+        return LazyProxy(partial(plan.getter, plan, **kwargs))
+
+    def _get_request_service(self, plan: ServicePlan, **kwargs):
+        if kwargs:
+            return plan.builder(plan, **kwargs)
+
+        scoped_services = self._get_state().scoped_services
+        if plan.name not in scoped_services:
+            scoped_services[plan.name] = plan.builder(plan)
+
+        return scoped_services[plan.name]
+
+    def _get_singleton_service(self, plan: ServicePlan, **kwargs):
+        if kwargs:
+            return plan.builder(plan, **kwargs)
+
+        try:
+            return self._singletons[plan.name]
+        except KeyError:
+            pass
+
+        with self._singleton_locks.hold(plan.name):
+            try:
+                return self._singletons[plan.name]
+            except KeyError:
+                pass
+
+            service = plan.builder(plan)
+
+            # Only a thread that would have deadlocked waiting for the lock could have stored one meanwhile.
+            return self._store_singleton(plan, service)
+
+    def _store_singleton(self, plan: ServicePlan, service: typing.Any):
+        with self._singletons_lock:
+            if self._plans.get(plan.name) is not plan:
+                # Built from a plan `reconf()` replaced meanwhile: it's only handed to whoever asked for it.
+                return service
+
+            return self._singletons.setdefault(plan.name, service)
+
+    def _get_service_instance(self, plan: ServicePlan):
+        return self.importer.get_obj(plan.path)
+
+    def _instance_service_with_class(self, plan: ServicePlan, **kwargs):
+        return self.importer.get_obj(plan.path)(*self._get_args(plan), **self._get_kwargs(plan, **kwargs))
+
+    def _instance_service_with_factory(self, plan: ServicePlan, **kwargs):
+        factory_class = self.importer.get_obj(plan.path)
+
+        if not hasattr(factory_class, "build") or not callable(factory_class.build):
+            raise NotAServiceFactoryError(self.NOT_A_SERVICE_FACTORY_ERRMSG.format(plan.name))
+
+        service = factory_class(*self._get_args(plan), **self._get_kwargs(plan, **kwargs)).build()
 
-        return ref  # Literal
+        # Imported here, as it's only needed to tell coroutines from services, awaitable ones included.
+        import inspect
+
+        # A coroutine can't be awaited here, and must not be cached in place of the service it would build.
+        if not isinstance(service, LazyProxy) and inspect.iscoroutine(service):
+            service.close()
+
+            raise AsyncFactoryError(self.ASYNC_FACTORY_ERRMSG.format(plan.name))
+
+        return service
+
+    def _get_args(self, plan: ServicePlan):
+        return [resolve() for resolve in plan.args]
+
+    def _get_kwargs(self, plan: ServicePlan, **kwargs):
+        if not kwargs:
+            return {k: resolve() for k, resolve in plan.kwargs}
+
+        return {k: kwargs.get(k) or resolve() for k, resolve in plan.kwargs}
+
+    async def _aget_service(self, service_name: str):
+        try:
+            value = await self.aget(service_name)
+
+        except UnknownServiceError:
+            # See if we are trying to access a service's attribute
+            service_name, service_attr = service_name.rsplit(".", 1)
+            if not service_attr:
+                raise
+
+            service = await self.aget(service_name)
+            value = getattr(service, service_attr)
+
+        return value
 
     def _get_service(self, service_name: str):
         try:
@@ -320,27 +1241,34 @@ class ServiceProvider:
 
         return value
 
-    def _get_conf(self, path: str):
+    def _get_conf(self, path: str, conf_index: typing.Mapping[str, typing.Any]):
+        # Children's indexes hold `MISSING` for the paths their app conf overrides removed.
+        value = conf_index.get(path, MISSING)
+        if value is MISSING:
+            raise BadConfPathError(self.BAD_CONF_PATH_ERRMSG.format(self._get_missing_conf_key(path, conf_index)))
+
+        return value
+
+    @staticmethod
+    def _get_missing_conf_key(path: str, conf_index: typing.Mapping[str, typing.Any]) -> str:
         parts = path.split(".")
 
-        try:
-            trunk = self.app_conf[parts[0]]
-        except KeyError:
-            raise BadConfPathError(self.BAD_CONF_PATH_ERRMSG.format(parts[0]))
+        for i, part in enumerate(parts):
+            if conf_index.get(".".join(parts[: i + 1]), MISSING) is MISSING:
+                return part
 
-        try:
-            return dictpath(trunk, parts[1:])
-        except KeyError as e:
-            raise BadConfPathError(self.BAD_CONF_PATH_ERRMSG.format(e.args[0]))
+        return path
 
-    def _get_env(self, var: str, default: typing.Optional[typing.Any] = None):
-        default = self._get_arg(default)
-        string = os.environ.get(var, default)
+    def _get_env(self, var: str, default: typing.Optional[Resolver] = None, env_type: typing.Optional[str] = None):
+        value = self._parse_env(var, MISSING, env_type)
+        if value is MISSING:
+            value = self._parse_env(var, None if default is None else default(), env_type)
 
-        try:
-            if string:
-                return literal_eval(string)
-        except Exception:
-            pass
+        return value
 
-        return string
+    def _parse_env(self, var: str, value: typing.Any, env_type: typing.Optional[str]):
+        """Parse a default value of `var` by its type, or get `var` itself if `value` is `MISSING`."""
+        try:
+            return self._env.get(var, env_type) if value is MISSING else self._env.parse(value, env_type)
+        except ValueError as e:
+            raise BadEnvValueError(self.BAD_ENV_VALUE_ERRMSG.format(var, env_type, e)) from e
@@ -0,0 +1,122 @@
+import contextvars
+import sys
+import typing
+
+
+class Resolution:
+    """The services built while resolving several services together, kept for those of the given scopes."""
+
+    __slots__ = ("scopes", "services")
+
+    def __init__(self, scopes: typing.Collection[str]) -> None:
+        self.scopes = scopes
+        self.services: typing.Dict[str, typing.Any] = {}
+
+
+class LocalState:
+    """What a provider keeps for the current thread or asyncio task."""
+
+    __slots__ = ("resolution", "scoped_services", "set_services")
+
+    def __init__(self) -> None:
+        self.set_services: typing.Dict[str, typing.Any] = {}
+        self.scoped_services: typing.Dict[str, typing.Any] = {}
+        self.resolution: typing.Optional[Resolution] = None
+
+    def copy(self) -> "LocalState":
+        """
+        Get the state of a task started from this one's: services set with `set()` are its own, but `request`
+        services and the resolution under way are shared, as the task is part of the same request, e.g. one
+        of those `aget()` resolves arguments in.
+        """
+        state = LocalState()
+        state.set_services = dict(self.set_services)
+        state.scoped_services = self.scoped_services
+        state.resolution = self.resolution
+
+        return state
+
+
+class LocalStorage:
+    """Keeps a `LocalState` per thread or asyncio task, until it's released."""
+
+    __slots__ = ()
+
+    def get_state(self) -> LocalState:
+        raise NotImplementedError()
+
+    def release(self):
+        raise NotImplementedError()
+
+
+class ContextVarLocalStorage(LocalStorage):
+    """
+    Keeps the state in a context variable.
+
+    Each thread gets its own state, and so does each asyncio task. Tasks inherit their context, and with it
+    the state of the task or thread that created them, so the state is kept along with the task it belongs to,
+    and tasks finding another's get a `LocalState.copy()` of it, sharing its `request` services.
+    """
+
+    __slots__ = ("_var",)
+
+    def __init__(self) -> None:
+        self._var: contextvars.ContextVar[typing.Optional[typing.Tuple[LocalState, typing.Any]]] = (
+            contextvars.ContextVar(f"pyrovider_local_{id(self)}", default=None)
+        )
+
+    def get_state(self) -> LocalState:
+        owner = _get_current_task()
+        entry = self._var.get()
+        if entry is not None and entry[1] is owner:
+            return entry[0]
+
+        state = LocalState() if entry is None else entry[0].copy()
+        self._var.set((state, owner))
+
+        return state
+
+    def release(self):
+        self._var.set(None)
+
+
+def _get_current_task() -> typing.Any:
+    """Get the running asyncio task, if any, without importing asyncio for processes that don't use it."""
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None or asyncio._get_running_loop() is None:
+        return None
+
+    return asyncio.current_task()
+
+
+class WerkzeugLocalStorage(LocalStorage):
+    """
+    Keeps the state in a `werkzeug.local.Local`, each task getting its own as with `ContextVarLocalStorage`.
+
+    Requires werkzeug to be installed.
+    """
+
+    __slots__ = ("_local", "_release_local")
+
+    def __init__(self) -> None:
+        try:
+            from werkzeug.local import Local, release_local
+        except ImportError:
+            from werkzeug import Local, release_local  # type: ignore[attr-defined,no-redef]
+
+        self._local = Local()
+        self._release_local = release_local
+
+    def get_state(self) -> LocalState:
+        owner = _get_current_task()
+        entry = getattr(self._local, "state", None)
+        if entry is not None and entry[1] is owner:
+            return entry[0]
+
+        state = LocalState() if entry is None else entry[0].copy()
+        self._local.state = (state, owner)
+
+        return state
+
+    def release(self):
+        self._release_local(self._local)
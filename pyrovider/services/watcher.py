@@ -0,0 +1,183 @@
+import logging
+import os
+import select
+import threading
+import typing
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) events telling a file was written, or replaced, removed or added in a watched directory.
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+
+class ConfWatcher:
+    """
+    Calls `reload` from a thread of its own whenever the files it watches change.
+
+    `get_paths` returns the paths of the files to watch, and is called again on every check, for files added
+    to watched directories or matching watched patterns to be picked up. Files are deemed changed when
+    their modification time or size changes, or when they appear or disappear.
+
+    On Linux, inotify wakes the watcher up as soon as a file of the directories holding them changes.
+    Elsewhere, or with `poll`, the files are checked every `interval` seconds, which inotify also falls back
+    to for directories it doesn't watch yet.
+
+    Errors raised by `get_paths` or `reload` are logged, and the files checked again on the next change.
+    """
+
+    def __init__(
+        self,
+        get_paths: typing.Callable[[], typing.Iterable[str]],
+        reload: typing.Callable[[], typing.Any],
+        interval: float = 1.0,
+        poll: bool = False,
+    ):
+        self.get_paths = get_paths
+        self.reload = reload
+        self.interval = interval
+        self.poll = poll
+        self._stamps = self._get_stamps()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def start(self) -> "ConfWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="pyrovider-conf-watcher", daemon=True)
+            self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def after_fork(self):
+        """Start watching again in a forked process, where the thread of the parent process doesn't run."""
+        if self._thread is not None:
+            self._thread = None
+            self._stop = threading.Event()
+            self.start()
+
+    def __enter__(self) -> "ConfWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def check(self) -> bool:
+        """Reload if the files changed since the last check, and tell whether they had."""
+        try:
+            stamps = self._get_stamps()
+        except Exception:
+            logger.exception("Failed to list the watched service conf files.")
+            return False
+
+        if stamps == self._stamps:
+            return False
+
+        self._stamps = stamps
+
+        try:
+            self.reload()
+        except Exception:
+            logger.exception("Failed to reload the service conf, keeping the current one.")
+
+        return True
+
+    def _get_stamps(self) -> typing.Dict[str, typing.Optional[typing.Tuple[int, int]]]:
+        stamps: typing.Dict[str, typing.Optional[typing.Tuple[int, int]]] = {}
+
+        for path in self.get_paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stamps[path] = None
+            else:
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+
+        return stamps
+
+    def _run(self):
+        inotify = None if self.poll else _Inotify.open()
+
+        if inotify is None:
+            while not self._stop.wait(self.interval):
+                self.check()
+
+            return
+
+        with inotify:
+            while not self._stop.is_set():
+                inotify.watch({os.path.dirname(os.path.abspath(path)) for path in self._stamps})
+
+                if inotify.wait(self.interval, self._stop):
+                    # Let editors finish writing before looking at the files.
+                    self._stop.wait(0.05)
+                    inotify.drain()
+
+                self.check()
+
+
+class _Inotify:
+    """The few inotify calls the watcher needs, through ctypes."""
+
+    def __init__(self, libc: typing.Any, fd: int):
+        self._libc = libc
+        self._fd = fd
+        self._watched: typing.Set[str] = set()
+
+    @classmethod
+    def open(cls) -> typing.Optional["_Inotify"]:
+        """Get an inotify instance, or None if inotify isn't available."""
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+
+        return cls(libc, fd) if fd >= 0 else None
+
+    def watch(self, directories: typing.Iterable[str]):
+        for directory in directories:
+            if (
+                directory not in self._watched
+                and self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK) >= 0
+            ):
+                self._watched.add(directory)
+
+    def wait(self, timeout: float, stop: threading.Event) -> bool:
+        """Wait up to `timeout` seconds for an event, and tell whether one came."""
+        # Waits in short steps, for the watcher not to take long to stop.
+        deadline = timeout
+        while deadline > 0 and not stop.is_set():
+            step = min(deadline, 0.1)
+            if select.select([self._fd], [], [], step)[0]:
+                return True
+            deadline -= step
+
+        return False
+
+    def drain(self):
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def __enter__(self) -> "_Inotify":
+        return self
+
+    def __exit__(self, *exc_info):
+        os.close(self._fd)
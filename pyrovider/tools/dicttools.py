@@ -5,10 +5,65 @@ def dictpath(dictionary: dict, path: list):
     """
     Find the node within a dictionary described by the path list.
     """
-    if not path or not isinstance(dictionary, dict):
-        return dictionary
-    else:
-        return dictpath(dictionary[path.pop(0)], path)
+    for key in path:
+        if not isinstance(dictionary, dict):
+            break
+
+        dictionary = dictionary[key]
+
+    return dictionary
+
+
+def dictflatten(arg, separator: str = ".") -> dict:
+    """
+    Index every node within a dictionary by its path, joined by the separator.
+
+    List items are indexed by their position, and inner nodes are indexed along with their leaves.
+    """
+    index: dict = {}
+    pending = [(str(k), v) for k, v in dictiter(arg)]
+
+    while pending:
+        path, value = pending.pop()
+        index[path] = value
+
+        if isinstance(value, (dict, list)):
+            pending.extend((f"{path}{separator}{k}", v) for k, v in dictiter(value))
+
+    return index
+
+
+def dictoverlay(
+    base: dict, overrides: dict, separator: str = "."
+) -> typing.Tuple[dict, typing.Dict[str, typing.Any], typing.List[str]]:
+    """
+    Merge overrides into a dictionary, sharing the nodes they leave untouched with it rather than copying them.
+
+    Dictionaries within the overrides are merged into those of the dictionary, other values replace its nodes.
+    Returns the merged dictionary, the nodes that changed indexed as `dictflatten` would index them, inner
+    nodes holding them included, and the paths of the nodes that are gone.
+    """
+    merged = dict(base)
+    changed: typing.Dict[str, typing.Any] = {}
+    removed: typing.List[str] = []
+
+    for key, value in overrides.items():
+        path = str(key)
+        old = base.get(key)
+
+        if isinstance(value, dict) and isinstance(old, dict):
+            value, node_changed, node_removed = dictoverlay(old, value, separator)
+            changed.update((f"{path}{separator}{k}", v) for k, v in node_changed.items())
+            removed.extend(f"{path}{separator}{k}" for k in node_removed)
+        else:
+            node_index = dictflatten(value, separator) if isinstance(value, (dict, list)) else {}
+            changed.update((f"{path}{separator}{k}", v) for k, v in node_index.items())
+            if isinstance(old, (dict, list)):
+                removed.extend(f"{path}{separator}{k}" for k in dictflatten(old, separator) if k not in node_index)
+
+        merged[key] = changed[path] = value
+
+    return merged, changed, removed
 
 
 def dictiter(arg):
@@ -0,0 +1,73 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import typing
+from pathlib import Path
+
+
+def load_yaml(path: typing.Union[str, Path], cache_dir: typing.Union[str, Path, None] = None) -> typing.Any:
+    """
+    Load a YAML file as `yaml.full_load` would.
+
+    With a `cache_dir`, the parsed content is pickled there, and loaded from there instead of parsing
+    the file again as long as the file keeps its modification time or its content. Only use directories
+    no one else can write to, as loading a pickle can run arbitrary code.
+    """
+    if cache_dir is None:
+        with open(path, "rb") as fp:
+            return _parse(fp.read())
+
+    path = os.path.abspath(path)
+    cache_path = Path(cache_dir) / f"{hashlib.sha1(path.encode()).hexdigest()}.pickle"
+    mtime = os.stat(path).st_mtime_ns
+    cached = _read_cache(cache_path)
+
+    if cached is not None and cached[0] == mtime:
+        return cached[2]
+
+    with open(path, "rb") as fp:
+        content = fp.read()
+
+    digest = hashlib.blake2b(content).hexdigest()
+
+    data = cached[2] if cached is not None and cached[1] == digest else _parse(content)
+
+    # Not being able to cache the file only means it will be parsed again.
+    with contextlib.suppress(OSError):
+        _write_cache(cache_path, (mtime, digest, data))
+
+    return data
+
+
+def _parse(content: bytes) -> typing.Any:
+    # Imported here, as importing PyYAML takes longer than importing the rest of pyrovider.
+    import yaml
+
+    # libyaml's loader is much faster than the pure Python one, when PyYAML was built with it.
+    return yaml.load(content, Loader=getattr(yaml, "CFullLoader", yaml.FullLoader))
+
+
+def _read_cache(cache_path: Path) -> typing.Optional[tuple]:
+    try:
+        with open(cache_path, "rb") as fp:
+            return pickle.load(fp)
+    except Exception:
+        # A missing or broken cache entry only means the file has to be parsed.
+        return None
+
+
+def _write_cache(cache_path: Path, entry: tuple):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Written to a temporary file first, so readers never see half an entry.
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            pickle.dump(entry, fp, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import unittest
+
+from pyrovider.services.provider import AsyncFactoryError, ServiceFactory, ServiceProvider
+
+
+class AsyncProviderTest(unittest.IsolatedAsyncioTestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        AsyncClient.connections = 0
+        self.provider = ServiceProvider()
+        self.provider.conf(
+            {
+                "client": {
+                    "factory": "tests.test_async.AsyncClientFactory",
+                    "arguments": ["%clients.url%"],
+                    "scope": "singleton",
+                },
+                "slow.a": {"factory": "tests.test_async.SlowFactory", "arguments": ["a"]},
+                "slow.b": {"factory": "tests.test_async.SlowFactory", "arguments": ["b"]},
+                "pair": {
+                    "class": "tests.test_async.Pair",
+                    "arguments": ["@slow.a", "@slow.b"],
+                    "named_arguments": {"client": "@client"},
+                },
+                "pairs": {"class": "tests.test_async.Pair", "arguments": ["@pair", "@pair"]},
+            },
+            {"clients": {"url": "db://localhost"}},
+        )
+
+    async def test_getting_a_service_with_an_async_factory(self):
+        # When...
+        client = await self.provider.aget("client")
+        # Then...
+        self.assertIsInstance(client, AsyncClient)
+        self.assertEqual("db://localhost", client.url)
+        self.assertTrue(client.connected)
+
+    async def test_resolving_arguments_concurrently(self):
+        # When...
+        pair = await asyncio.wait_for(self.provider.aget("pair"), timeout=SlowFactory.delay * 1.9)
+        # Then...
+        self.assertEqual(("a", "b"), (pair.a, pair.b))
+        self.assertIs(pair.client, await self.provider.aget("client"))
+
+    async def test_building_a_singleton_once(self):
+        # When...
+        pairs = await self.provider.aget("pairs")
+        # Then...
+        self.assertIs(pairs.a.client, pairs.b.client)
+        self.assertEqual(1, AsyncClient.connections)
+
+    def test_building_a_singleton_from_several_event_loops(self):
+        # Given...
+        self.provider.conf(
+            {"slow": {"factory": "tests.test_async.SlowFactory", "arguments": [[]], "scope": "singleton"}}
+        )
+        barrier = threading.Barrier(2)
+        results = []
+
+        async def get_slow():
+            barrier.wait()
+            return await self.provider.aget("slow")
+
+        threads = [threading.Thread(target=lambda: results.append(asyncio.run(get_slow()))) for _ in range(2)]
+        # When...
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Then...
+        self.assertEqual(2, len(results))
+        self.assertIs(results[0], results[1])
+        self.assertIs(results[0], self.provider._singletons["slow"])
+
+    async def test_sharing_singletons_with_a_child(self):
+        # Given...
+        child = self.provider.child({"slow.a": {"factory": "tests.test_async.SlowFactory", "arguments": ["c"]}})
+        # When...
+        pair = await child.aget("pair")
+        # Then...
+        self.assertEqual(("c", "b"), (pair.a, pair.b))
+        self.assertIs(pair.client, await self.provider.aget("client"))
+        self.assertNotIn("client", child._singletons)
+        self.assertEqual(1, AsyncClient.connections)
+
+    async def test_getting_a_service_from_a_namespace(self):
+        # When...
+        a = await self.provider.slow.aget("a")
+        # Then...
+        self.assertEqual("a", a)
+
+    async def test_getting_a_service_with_an_async_factory_synchronously(self):
+        # When...
+        with self.assertRaises(AsyncFactoryError):
+            self.provider.get("client")
+        # Then...
+        self.assertNotIn("client", self.provider._singletons)
+        self.assertIsInstance(await self.provider.aget("client"), AsyncClient)
+
+    async def test_getting_awaitable_services(self):
+        # Given...
+        self.provider.conf(
+            {
+                "awaitable": {"factory": "tests.test_async.AwaitableClientFactory"},
+                "lazy": {"class": "tests.test_async.Pair", "arguments": [None, None], "lazy": True},
+                "wrap": {"factory": "tests.test_async.WrapFactory", "arguments": ["@lazy"]},
+            }
+        )
+        # When...
+        client, async_client = self.provider.get("awaitable"), await self.provider.aget("awaitable")
+        wrapped, async_wrapped = self.provider.get("wrap"), await self.provider.aget("wrap")
+        # Then...
+        self.assertIsInstance(client, AwaitableClient)
+        self.assertIsInstance(async_client, AwaitableClient)
+        self.assertFalse(client.closed)
+        self.assertIsNone(wrapped.a)
+        self.assertIsNone(async_wrapped.b)
+
+    async def test_getting_request_services(self):
+        # Given...
+        self.provider.conf(
+            {
+                "req": {"class": "tests.test_async.Pair", "arguments": [None, None], "scope": "request"},
+                "top": {"class": "tests.test_async.Pair", "arguments": ["@req", "@req"]},
+            }
+        )
+        # When...
+        top, other_top, req = (
+            await self.provider.aget("top"),
+            await self.provider.aget("top"),
+            await self.provider.aget("req"),
+        )
+        # Then...
+        self.assertIs(req, top.a)
+        self.assertIs(req, top.b)
+        self.assertIs(req, other_top.a)
+        self.provider.reset()
+        self.assertIsNot(req, await self.provider.aget("req"))
+
+    async def test_getting_a_set_service(self):
+        # Given...
+        self.provider.set("client", "fake")
+        # When, then...
+        self.assertEqual("fake", await self.provider.aget("client"))
+
+
+class AsyncClient:
+    connections = 0
+
+    def __init__(self, url):
+        self.url = url
+        self.connected = False
+
+    async def connect(self):
+        await asyncio.sleep(0)
+        AsyncClient.connections += 1
+        self.connected = True
+
+
+class AsyncClientFactory(ServiceFactory):
+    def __init__(self, url):
+        self.url = url
+
+    async def build(self):
+        client = AsyncClient(self.url)
+        await client.connect()
+
+        return client
+
+
+class SlowFactory(ServiceFactory):
+    delay = 0.1
+
+    def __init__(self, value):
+        self.value = value
+
+    async def build(self):
+        await asyncio.sleep(self.delay)
+
+        return self.value
+
+
+class AwaitableClient:
+    """A client built synchronously, which can also be awaited, as e.g. `redis.asyncio.Redis`."""
+
+    def __init__(self):
+        self.closed = False
+
+    def __await__(self):
+        return asyncio.sleep(0, self).__await__()
+
+    def close(self):
+        self.closed = True
+
+
+class AwaitableClientFactory(ServiceFactory):
+    def build(self):
+        return AwaitableClient()
+
+
+class WrapFactory(ServiceFactory):
+    def __init__(self, service):
+        self.service = service
+
+    def build(self):
+        return self.service
+
+
+class Pair:
+    def __init__(self, a, b, client=None):
+        self.a = a
+        self.b = b
+        self.client = client
@@ -0,0 +1,157 @@
+import importlib.util
+import pathlib
+from unittest import mock
+
+import pytest
+
+from pyrovider.__main__ import main
+from pyrovider.services.compiler import CompileError, compile_provider
+from pyrovider.services.provider import (
+    NoCreationMethodError,
+    NotAServiceFactoryError,
+    ServiceProvider,
+    UnknownServiceError,
+)
+from pyrovider.tools.yamltools import load_yaml
+
+from .test_provider import MockServiceA, MockServiceB, MockServiceI, mock_service_instance
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def load_module(path: pathlib.Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def compile_module(tmp_path: pathlib.Path, service_conf: dict, app_conf=None):
+    path = tmp_path / "container.py"
+    path.write_text(compile_provider(service_conf, app_conf))
+
+    return load_module(path)
+
+
+@pytest.fixture
+def container(tmp_path):
+    module = compile_module(tmp_path, load_yaml(DATA_DIR / "service_conf.yaml"), load_yaml(DATA_DIR / "app_conf.yaml"))
+
+    return module.Container()
+
+
+def test_compiled_services(container):
+    with mock.patch.dict("os.environ", {"INT_ENV_VAR": "1", "BOOL_ENV_VAR": "False"}):
+        service_b = container.get("service-b")
+        service_i = container.get("service-i")
+        service_j = container.get("service-j")
+
+    assert isinstance(container.get("service-a"), MockServiceA)
+    assert isinstance(service_b, MockServiceB)
+    assert service_b.some_configuration == {"version": "1", "url": "https://api.some-app.com/v1/"}
+    assert service_b.some_env_var == "Some default value."
+    assert service_b.other_env_var == "https://api.some-app.com/v1/"
+    assert service_b.some_integer == 1
+    assert service_b.some_boolean is False
+    assert service_b.password == "default"
+    assert isinstance(service_i, MockServiceI)
+    assert service_i.some_services_2[1] is mock_service_instance
+    assert service_j.password == "test"
+
+
+def test_compiled_services_match_the_provider(container):
+    provider = ServiceProvider()
+    provider.conf(load_yaml(DATA_DIR / "service_conf.yaml"), load_yaml(DATA_DIR / "app_conf.yaml"))
+
+    with mock.patch.dict("os.environ", {"SOME_ENV_VAR": "env", "INT_ENV_VAR": "1", "BOOL_ENV_VAR": "1"}):
+        expected, compiled = provider.get("service-b"), container.get("service-b")
+
+    assert {**vars(expected), "service_a": None} == {**vars(compiled), "service_a": None}
+
+
+def test_compiled_scopes(container):
+    assert container.get("service-a") is not container.get("service-a")
+
+    service_l, service_m = container.get("service-l"), container.get("service-m")
+    assert service_m is container.get("service-m")
+    container.reset()
+    assert service_l is container.get("service-l")
+    assert service_m is not container.get("service-m")
+
+
+def test_compiled_errors(container):
+    with pytest.raises(NoCreationMethodError):
+        container.get("service-d")
+    with pytest.raises(NotAServiceFactoryError):
+        container.get("service-f")
+    with pytest.raises(UnknownServiceError):
+        container.get("service-unknown")
+
+
+def test_setting_compiled_services(container):
+    service_a = MockServiceA()
+    service_a.field_1 = "set"
+
+    container.set("service-a", service_a)
+
+    assert container.get("service-a") is service_a
+    assert container.get("service-j").password == "set"
+
+
+def test_compiled_namespaces_and_lazy_services(tmp_path):
+    module = compile_module(
+        tmp_path,
+        {
+            "service1": {"class": "tests.test_provider.MockServiceA", "lazy": True},
+            "foo.service2": {"class": "tests.test_provider.MockServiceI", "arguments": ["@service1", "^os.sep"]},
+        },
+    )
+
+    service2 = module.provider.foo.service2
+
+    assert module.provider.namespaces == ["foo"]
+    assert module.provider.service1.field_1 == "test"
+    assert isinstance(service2.some_services_1, MockServiceA)
+    assert service2.some_services_2 == __import__("os").sep
+
+
+def test_compiled_lazy_request_services(tmp_path):
+    module = compile_module(
+        tmp_path, {"service1": {"class": "tests.test_provider.MockServiceA", "lazy": True, "scope": "request"}}
+    )
+    container = module.Container()
+
+    service1, same_service1 = container.get("service1"), container.get("service1")
+
+    assert service1.field_1 == "test"
+    assert vars(service1) is vars(same_service1)
+    container.reset()
+    assert vars(container.get("service1")) is not vars(service1)
+
+
+def test_compiling_values_without_a_literal(tmp_path):
+    with pytest.raises(CompileError):
+        compile_provider({"a": {"class": "tests.test_provider.MockServiceA", "arguments": [object()]}})
+
+
+def test_compile_command(tmp_path, capsys):
+    output = tmp_path / "container.py"
+
+    assert main(["compile", str(DATA_DIR / "service_conf.yaml"), "-a", str(DATA_DIR / "app_conf.yaml")]) == 0
+    assert (
+        main(
+            [
+                "compile",
+                str(DATA_DIR / "service_conf.yaml"),
+                "--app-conf",
+                str(DATA_DIR / "app_conf.yaml"),
+                "-o",
+                str(output),
+            ]
+        )
+        == 0
+    )
+
+    assert capsys.readouterr().out == output.read_text()
+    assert isinstance(load_module(output).provider.get("service-a"), MockServiceA)
@@ -1,6 +1,6 @@
 import unittest
 
-from pyrovider.tools.dicttools import dictiter, dictpath, dictwalk
+from pyrovider.tools.dicttools import dictflatten, dictiter, dictoverlay, dictpath, dictwalk
 
 
 class DictToolsTest(unittest.TestCase):
@@ -74,3 +74,45 @@ class DictToolsTest(unittest.TestCase):
         v = dictpath(d, ["wee", "key"])
         # Then...
         self.assertEqual(["Yet another phrase we're going to change.", 4, "This one we won't"], v)
+
+    def test_dictflatten(self):
+        # Given...
+        d = {"yeah": 2, "wee": {"key": ["phrase", {"deep": 4}]}}
+        # When...
+        index = dictflatten(d)
+        # Then...
+        self.assertEqual(
+            {
+                "yeah": 2,
+                "wee": {"key": ["phrase", {"deep": 4}]},
+                "wee.key": ["phrase", {"deep": 4}],
+                "wee.key.0": "phrase",
+                "wee.key.1": {"deep": 4},
+                "wee.key.1.deep": 4,
+            },
+            index,
+        )
+        self.assertIs(d["wee"], index["wee"])
+
+    def test_dictoverlay(self):
+        # Given...
+        d = {"yeah": 2, "wee": {"key": ["phrase", {"deep": 4}], "other": {"deep": 5}}}
+        # When...
+        merged, changed, removed = dictoverlay(d, {"wee": {"key": "flat", "new": {"deep": 6}}})
+        # Then...
+        self.assertEqual(
+            {"yeah": 2, "wee": {"key": "flat", "other": {"deep": 5}, "new": {"deep": 6}}},
+            merged,
+        )
+        self.assertEqual(
+            {
+                "wee": {"key": "flat", "other": {"deep": 5}, "new": {"deep": 6}},
+                "wee.key": "flat",
+                "wee.new": {"deep": 6},
+                "wee.new.deep": 6,
+            },
+            changed,
+        )
+        self.assertEqual({"wee.key.0", "wee.key.1", "wee.key.1.deep"}, set(removed))
+        self.assertIs(d["wee"]["other"], merged["wee"]["other"])
+        self.assertEqual(["phrase", {"deep": 4}], d["wee"]["key"])
@@ -0,0 +1,125 @@
+import unittest
+from ast import literal_eval
+from unittest import mock
+
+from pyrovider.services.env import MISSING, EnvSnapshot
+from pyrovider.services.provider import BadEnvValueError, ServiceProvider, UnknownEnvTypeError
+
+
+class EnvSnapshotTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.environ = {"INT": "8080", "BOOL": "yes", "JSON": '{"a": [1]}', "LIST": "a, b,c", "LITERAL": "[1, 2]"}
+        self.env = EnvSnapshot(self.environ)
+
+    def test_getting_typed_variables(self):
+        self.assertEqual(8080, self.env.get("INT", "int"))
+        self.assertEqual("8080", self.env.get("INT", "str"))
+        self.assertEqual(8080.0, self.env.get("INT", "float"))
+        self.assertIs(True, self.env.get("BOOL", "bool"))
+        self.assertEqual({"a": [1]}, self.env.get("JSON", "json"))
+        self.assertEqual(["a", "b", "c"], self.env.get("LIST", "list"))
+        self.assertEqual([1, 2], self.env.get("LITERAL", "list"))
+
+    def test_getting_untyped_variables(self):
+        self.assertEqual(8080, self.env.get("INT"))
+        self.assertEqual("yes", self.env.get("BOOL"))
+        self.assertEqual([1, 2], self.env.get("LITERAL"))
+        self.assertIs(MISSING, self.env.get("UNSET"))
+
+    def test_reading_variables_once(self):
+        # Given...
+        self.env.get("INT")
+        self.environ["INT"] = "1"
+        # When, then...
+        self.assertEqual(8080, self.env.get("INT"))
+        self.env.refresh()
+        self.assertEqual(1, self.env.get("INT"))
+
+    def test_getting_invalid_variables(self):
+        with self.assertRaises(ValueError):
+            self.env.get("LIST", "int")
+
+    def test_getting_a_copy_of_containers(self):
+        # When...
+        first, second = self.env.get("JSON", "json"), self.env.get("JSON", "json")
+        default, other_default = self.env.parse('["a"]'), self.env.parse('["a"]')
+        first["a"].append(2)
+        default.append("x")
+        # Then...
+        self.assertEqual({"a": [1]}, second)
+        self.assertEqual({"a": [1]}, self.env.get("JSON", "json"))
+        self.assertEqual(["a"], other_default)
+        self.assertEqual(["a"], self.env.parse('["a"]'))
+
+    def test_parsing_defaults_once(self):
+        # When...
+        with mock.patch("pyrovider.services.env.literal_eval", wraps=literal_eval) as parse:
+            values = [self.env.parse("[1, 2]") for _ in range(3)]
+        # Then...
+        self.assertEqual([[1, 2]] * 3, values)
+        self.assertEqual(1, parse.call_count)
+        self.assertEqual(1, self.env.parse("1", "int"))
+        with self.assertRaises(ValueError):
+            self.env.parse("a", "int")
+
+
+class ProviderEnvTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.environ = {"PORT": "8080"}
+        self.provider = ServiceProvider()
+        self.provider._env = EnvSnapshot(self.environ)
+        self.provider.conf(
+            {
+                "typed": {
+                    "class": "tests.test_env.Arguments",
+                    "arguments": [["$PORT", "80", "int"], ["$DEBUG", False, "bool"], ["$HOSTS", "localhost", "list"]],
+                },
+                "unknown-type": {
+                    "class": "tests.test_env.Arguments",
+                    "arguments": [["$PORT", "80", "integer"]],
+                },
+            }
+        )
+
+    def test_getting_typed_variables(self):
+        self.assertEqual((8080, False, ["localhost"]), self.provider.get("typed").args)
+
+    def test_getting_a_list_of_its_own_per_service(self):
+        # Given...
+        hosts = [self.provider.get("typed").args[2] for _ in range(3)]
+        # When...
+        for service_hosts in hosts:
+            service_hosts.append("x")
+        # Then...
+        self.assertEqual([["localhost", "x"]] * 3, hosts)
+        self.assertEqual(["localhost"], self.provider.get("typed").args[2])
+
+    def test_refreshing_variables(self):
+        # Given...
+        self.provider.get("typed")
+        self.environ["PORT"] = "nope"
+        # When, then...
+        self.assertEqual(8080, self.provider.get("typed").args[0])
+        self.provider.refresh_env()
+        with self.assertRaises(BadEnvValueError) as context:
+            self.provider.get("typed")
+        self.assertTrue(str(context.exception).startswith('The environment variable "PORT" is not a valid "int": '))
+
+    def test_getting_an_unknown_type(self):
+        with self.assertRaises(UnknownEnvTypeError) as context:
+            self.provider.get("unknown-type")
+        self.assertEqual(
+            'The type "integer" of the environment variable "PORT" is not one of: str, int, float, bool, json, list.',
+            str(context.exception),
+        )
+
+
+class Arguments:
+    def __init__(self, *args):
+        self.args = args
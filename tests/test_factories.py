@@ -1,4 +1,5 @@
 import pathlib
+import tempfile
 import unittest
 
 from pyrovider.services import factories
@@ -62,6 +63,52 @@ class FactoryTest(unittest.TestCase):
         assert list(p.test2.service_names) == ["service1"]
         assert list(p.test2.namespaces) == ["foo"]
 
+    def test_build_from_directories_and_globs(self):
+        # Given...
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            directory = pathlib.Path(tmp_dir)
+            (directory / "b.yaml").write_text("serviceB:\n  class: tests.test_provider.MockServiceA\n")
+            (directory / "a.yml").write_text("serviceA:\n  class: tests.test_provider.MockServiceA\n")
+            (directory / "notes.txt").write_text("Not a service file.")
+            (directory / "sub").mkdir()
+            (directory / "sub" / "c.yaml").write_text("serviceC:\n  class: tests.test_provider.MockServiceA\n")
+            # When...
+            from_directory = factories.service_provider_from_sources(
+                factories.ServiceDefinitionSource("test", directory)
+            )
+            from_glob = factories.service_provider_from_sources(
+                factories.ServiceDefinitionSource("test", directory / "**" / "*.yaml", False), max_workers=2
+            )
+            from_processes = factories.service_provider_from_sources(
+                factories.ServiceDefinitionSource("test", directory), processes=True
+            )
+
+        # Then...
+        assert from_directory.test.service_names == ["serviceA", "serviceB"]
+        assert from_glob.service_names == ["serviceB", "serviceC"]
+        assert from_processes.test.service_names == ["serviceA", "serviceB"]
+
+    def test_build_from_a_glob_without_matches(self):
+        with self.assertRaises(FileNotFoundError):
+            factories.service_provider_from_sources(factories.ServiceDefinitionSource("test", DATA_DIR / "*.json"))
+
+    def test_build_with_duplicates(self):
+        # When...
+        with self.assertRaises(ValueError) as context:
+            factories.service_provider_from_sources(
+                factories.ServiceDefinitionSource("test", DATA_DIR / "service_conf_2.yaml", False),
+                factories.ServiceDefinitionSource("other", DATA_DIR / "service_conf_2.yaml", False),
+            )
+
+        # Then...
+        path = DATA_DIR / "service_conf_2.yaml"
+        assert str(context.exception) == "\n".join(
+            [
+                f"Duplicated entry serviceA from source ({path}), already defined in ({path})",
+                f"Duplicated entry serviceB from source ({path}), already defined in ({path})",
+            ]
+        )
+
     def test_build_with_parent(self):
         parent = factories.service_provider_from_yaml(DATA_DIR / "service_conf_2.yaml")
 
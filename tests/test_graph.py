@@ -0,0 +1,83 @@
+import unittest
+
+from pyrovider.services.graph import DependencyGraph
+from pyrovider.services.provider import CircularDependencyError, ServiceProvider
+
+
+class DependencyGraphTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.graph = DependencyGraph({"a": ["b", "c"], "b": ["c"], "c": [], "d": ["a"]})
+
+    def test_finding_no_cycle(self):
+        self.assertIsNone(self.graph.find_cycle())
+
+    def test_finding_a_cycle(self):
+        # Given...
+        graph = DependencyGraph({"a": ["b"], "b": ["c"], "c": ["a"], "d": []})
+        # When, then...
+        self.assertEqual(["a", "b", "c", "a"], graph.find_cycle())
+        self.assertIsNone(graph.find_cycle(skip={"c"}))
+
+    def test_getting_closures(self):
+        self.assertEqual({"a", "b", "c"}, self.graph.get_closure(["a"]))
+        self.assertEqual({"a", "b", "d"}, self.graph.get_dependents_closure(["b"]))
+
+    def test_topological_order(self):
+        self.assertEqual(["c", "b", "a", "d"], self.graph.topological_order())
+        self.assertEqual(["c", "b"], self.graph.topological_order(["b"]))
+
+    def test_deriving_a_graph(self):
+        # When...
+        graph = self.graph.derive({"b": [], "e": ["b"], "c": ["d"]})
+        # Then...
+        self.assertEqual({"a", "b", "c", "d", "e"}, graph.get_dependents_closure(["b"]))
+        self.assertEqual({"a", "b", "c", "d"}, graph.get_closure(["a"]))
+        self.assertEqual(["c", "d", "a", "c"], graph.find_cycle(roots=["c"]))
+        self.assertEqual({"a", "b", "d"}, self.graph.get_dependents_closure(["b"]))
+        self.assertIsNone(self.graph.find_cycle())
+
+
+class ProviderDependencyGraphTest(unittest.TestCase):
+    maxDiff = None
+
+    def test_building_the_graph_from_the_conf(self):
+        # Given...
+        provider = ServiceProvider()
+        # When...
+        provider.conf(
+            {
+                "a": {"class": "tests.test_provider.MockServiceA"},
+                "b": {"class": "tests.test_provider.MockServiceI", "arguments": [["@a", "@a.field_1"], "@other.x"]},
+            }
+        )
+        # Then...
+        self.assertEqual({"a": (), "b": ("a",)}, provider.dependency_graph.dependencies)
+
+    def test_configuring_circular_dependencies(self):
+        # Given...
+        provider = ServiceProvider()
+        # When, then...
+        with self.assertRaises(CircularDependencyError) as context:
+            provider.conf(
+                {
+                    "a": {"class": "tests.test_provider.MockServiceA", "arguments": ["@b"]},
+                    "b": {"class": "tests.test_provider.MockServiceA", "named_arguments": {"a": "@a"}},
+                }
+            )
+        self.assertEqual("The services depend on each other in a circle: a -> b -> a.", str(context.exception))
+
+    def test_configuring_circular_dependencies_through_a_lazy_service(self):
+        # Given...
+        provider = ServiceProvider()
+        # When...
+        provider.conf(
+            {
+                "a": {"class": "tests.test_provider.MockServiceA", "arguments": ["@b"], "lazy": True},
+                "b": {"class": "tests.test_provider.MockServiceA", "named_arguments": {"a": "@a"}},
+            }
+        )
+        # Then...
+        self.assertEqual(("b",), provider.dependency_graph.dependencies["a"])
@@ -0,0 +1,56 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent
+
+# Modules that take long to import, which pyrovider only needs for some of its features.
+SLOW_IMPORTS = ["yaml", "dotenv", "asyncio", "concurrent.futures"]
+
+
+def get_imported_modules(statement: str) -> set:
+    """Run a statement in a new interpreter with `-X importtime`, and get the modules it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import pyrovider",
+        "from pyrovider.services.provider import ServiceProvider",
+        "from pyrovider.services.compiled import CompiledProvider",
+    ],
+)
+def test_import_time(statement):
+    modules = get_imported_modules(statement) - get_imported_modules("pass")
+
+    assert "pyrovider.services.provider" in modules
+    assert [name for name in SLOW_IMPORTS if name in modules] == []
+
+
+def test_no_dotenv_lookup_until_env_vars_are_read():
+    statement = "\n".join(
+        [
+            "import sys",
+            "from pyrovider.services.provider import ServiceProvider",
+            "provider = ServiceProvider()",
+            "provider.conf({'a': {'class': 'builtins.str'}})",
+            "provider.get('a')",
+            "assert 'dotenv' not in sys.modules",
+            "provider.conf({'a': {'class': 'builtins.str', 'arguments': ['$PATH']}})",
+            "provider.get('a')",
+            "assert 'dotenv' in sys.modules",
+        ]
+    )
+
+    subprocess.run([sys.executable, "-c", statement], cwd=ROOT_DIR, check=True)
@@ -0,0 +1,175 @@
+import contextlib
+import unittest
+
+from pyrovider.services.instrumentation import BuildHook
+from pyrovider.services.provider import ServiceProvider
+
+SERVICE_CONF = {
+    "a": {"class": "tests.test_provider.MockServiceA"},
+    "a-singleton": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+    "i": {"class": "tests.test_provider.MockServiceI", "arguments": ["@a", "@a-singleton"]},
+    "factory": {"factory": "tests.test_provider.MockServiceFactory", "arguments": ["@a"], "scope": "request"},
+    "instance": {"instance": "tests.test_provider.mock_service_instance"},
+}
+
+
+class RecordingHook(BuildHook):
+    def __init__(self):
+        self.calls = []
+
+    def before_build(self, name):
+        self.calls.append(("before", name))
+
+    def after_build(self, name, elapsed, error):
+        self.calls.append(("after", name, type(error).__name__ if error else None))
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name):
+        self.spans.append(name)
+        yield
+
+
+class InstrumentationTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.provider = ServiceProvider()
+        self.provider.conf(SERVICE_CONF)
+
+    def test_uninstrumented_provider_has_no_stats(self):
+        # When...
+        self.provider.get("a")
+        # Then...
+        self.assertEqual({}, self.provider.stats())
+
+    def test_counting_hits_and_misses(self):
+        # Given...
+        self.provider.instrument()
+        # When...
+        self.provider.get("i")
+        self.provider.get("i")
+        self.provider.get("factory")
+        self.provider.get("factory")
+        self.provider.get("instance")
+        self.provider.set("a", "set a")
+        self.provider.get("a")
+        stats = self.provider.stats()
+        # Then...
+        self.assertEqual({"set": 0}, stats["i"]["hits"])
+        self.assertEqual({"class": 2}, stats["i"]["misses"])
+        self.assertEqual({"set": 1}, stats["a"]["hits"])
+        self.assertEqual({"class": 3}, stats["a"]["misses"])
+        self.assertEqual(4, stats["a"]["gets"])
+        self.assertEqual({"set": 0, "singleton": 1}, stats["a-singleton"]["hits"])
+        self.assertEqual({"class": 1}, stats["a-singleton"]["misses"])
+        self.assertEqual({"set": 0, "request": 1}, stats["factory"]["hits"])
+        self.assertEqual({"factory": 1}, stats["factory"]["misses"])
+        self.assertEqual({"set": 0, "instance": 1}, stats["instance"]["hits"])
+        self.assertEqual({}, stats["instance"]["misses"])
+
+    def test_counting_services_shared_by_get_many(self):
+        # Given...
+        self.provider.instrument()
+        # When...
+        self.provider.get_many(["i", "a"])
+        stats = self.provider.stats()
+        # Then...
+        self.assertEqual({"set": 0, "resolution": 1}, stats["a"]["hits"])
+        self.assertEqual({"class": 1}, stats["a"]["misses"])
+        self.assertEqual(2, stats["a"]["gets"])
+
+    def test_timing_builds(self):
+        # Given...
+        self.provider.instrument()
+        # When...
+        self.provider.get("i")
+        stats = self.provider.stats()
+        # Then...
+        self.assertEqual(1, stats["i"]["builds"])
+        self.assertGreater(stats["i"]["total_time"], 0)
+        self.assertGreaterEqual(stats["i"]["total_time"], stats["a"]["total_time"])
+        self.assertEqual(stats["i"]["total_time"], stats["i"]["max_time"])
+
+    def test_counting_warmed_up_singletons_as_hits(self):
+        # Given...
+        self.provider.instrument()
+        self.provider.warmup(["a-singleton"])
+        # When...
+        self.provider.get("a-singleton")
+        stats = self.provider.stats()
+        # Then...
+        self.assertEqual(1, stats["a-singleton"]["builds"])
+        self.assertEqual({"set": 0, "singleton": 1}, stats["a-singleton"]["hits"])
+
+    def test_calling_hooks_and_tracing_builds(self):
+        # Given...
+        hook, tracer = RecordingHook(), RecordingTracer()
+        self.provider.instrument(hook, tracer=tracer)
+        # When...
+        self.provider.get("i")
+        # Then...
+        self.assertEqual(
+            [
+                ("before", "i"),
+                ("before", "a"),
+                ("after", "a", None),
+                ("before", "a-singleton"),
+                ("after", "a-singleton", None),
+                ("after", "i", None),
+            ],
+            hook.calls,
+        )
+        self.assertEqual(["build i", "build a", "build a-singleton"], tracer.spans)
+
+    def test_calling_hooks_on_failed_builds(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf({"broken": {"factory": "tests.test_provider.MockServiceFactoryWithoutBuild"}})
+        hook = RecordingHook()
+        provider.instrument(hook)
+        # When...
+        with self.assertRaises(NotImplementedError):
+            provider.get("broken")
+        # Then...
+        self.assertEqual([("before", "broken"), ("after", "broken", "NotImplementedError")], hook.calls)
+
+    def test_uninstrumenting(self):
+        # Given...
+        hook = RecordingHook()
+        self.provider.instrument(hook)
+        # When...
+        self.provider.uninstrument()
+        self.provider.get("i")
+        # Then...
+        self.assertEqual([], hook.calls)
+        self.assertEqual({}, self.provider.stats())
+
+    def test_instrumenting_a_new_conf(self):
+        # Given...
+        self.provider.instrument()
+        # When...
+        self.provider.conf(SERVICE_CONF)
+        self.provider.get("a")
+        # Then...
+        self.assertEqual(1, self.provider.stats()["a"]["builds"])
+
+
+class AsyncInstrumentationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_counting_async_gets(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf(SERVICE_CONF)
+        provider.instrument()
+        # When...
+        await provider.aget("a-singleton")
+        await provider.aget("a-singleton")
+        stats = provider.stats()
+        # Then...
+        self.assertEqual({"set": 0, "singleton": 1}, stats["a-singleton"]["hits"])
+        self.assertEqual({"class": 1}, stats["a-singleton"]["misses"])
@@ -1,4 +1,7 @@
+import importlib
+import threading
 import unittest
+from unittest import mock
 
 from pyrovider.meta.ioc import Importer
 
@@ -16,3 +19,45 @@ class ImporterTest(unittest.TestCase):
             importer.get_obj("pyrovider.meta.ioc.Undefined")
 
         self.assertEqual("'Undefined'", str(context.exception))
+
+    def test_get_obj_is_cached(self):
+        importer = Importer()
+        importer.get_obj("pyrovider.meta.ioc.Importer")
+
+        with mock.patch("importlib.import_module") as import_module:
+            self.assertEqual(Importer, importer.get_obj("pyrovider.meta.ioc.Importer"))
+
+        import_module.assert_not_called()
+
+    def test_get_obj_is_shared_by_threads(self):
+        importer = Importer()
+        importer.get_obj("pyrovider.meta.ioc.Importer")
+        objs = []
+
+        with mock.patch("importlib.import_module") as import_module:
+            thread = threading.Thread(target=lambda: objs.append(Importer().get_obj("pyrovider.meta.ioc.Importer")))
+            thread.start()
+            thread.join()
+
+        import_module.assert_not_called()
+        self.assertEqual([Importer], objs)
+
+    def test_get_obj_undefined_is_cached(self):
+        importer = Importer()
+        with self.assertRaises(ModuleNotFoundError):
+            importer.get_obj("pyrovider.undefined.Undefined")
+
+        with mock.patch("importlib.import_module") as import_module, self.assertRaises(ModuleNotFoundError):
+            importer.get_obj("pyrovider.undefined.Undefined")
+
+        import_module.assert_not_called()
+
+    def test_clear(self):
+        importer = Importer()
+        importer.get_obj("pyrovider.meta.ioc.Importer")
+        importer.clear()
+
+        with mock.patch("importlib.import_module", wraps=importlib.import_module) as import_module:
+            importer.get_obj("pyrovider.meta.ioc.Importer")
+
+        import_module.assert_called_once_with("pyrovider.meta.ioc")
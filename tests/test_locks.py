@@ -0,0 +1,59 @@
+import threading
+import unittest
+
+from pyrovider.services.locks import KeyedLocks
+
+
+class KeyedLocksTest(unittest.TestCase):
+    def setUp(self):
+        # Given...
+        self.locks = KeyedLocks()
+
+    def test_holding_a_key_again_from_the_same_thread(self):
+        # When...
+        with self.locks.hold("a") as outer, self.locks.hold("a") as inner:
+            pass
+        # Then...
+        self.assertTrue(outer)
+        self.assertTrue(inner)
+
+    def test_not_waiting_for_other_keys(self):
+        # Given...
+        held = []
+
+        def hold():
+            with self.locks.hold("b") as locked:
+                held.append(locked)
+
+        # When...
+        with self.locks.hold("a"):
+            thread = threading.Thread(target=hold)
+            thread.start()
+            thread.join(timeout=1)
+        # Then...
+        self.assertEqual([True], held)
+
+    def test_not_deadlocking_threads_waiting_for_each_other(self):
+        # Given...
+        a_held, b_held = threading.Event(), threading.Event()
+        results = {}
+
+        def hold(first, second, first_held, second_held):
+            with self.locks.hold(first):
+                first_held.set()
+                second_held.wait()
+                with self.locks.hold(second) as locked:
+                    results[first] = locked
+
+        threads = [
+            threading.Thread(target=hold, args=("a", "b", a_held, b_held)),
+            threading.Thread(target=hold, args=("b", "a", b_held, a_held)),
+        ]
+        # When...
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        # Then...
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual([False, True], sorted(results.values()))
@@ -62,6 +62,19 @@ class NamespaceTest(unittest.TestCase):
         assert self.provider.foo.path == "foo"
         assert self.provider.foo.bar.path == "foo.bar"
 
+    def test_namespaces_know_their_services_keys(self):
+        assert self.provider.foo.bar._service_keys == {"service4": "foo.bar.service4"}
+        assert self.provider.foo.bar.parent is self.provider.foo
+        assert not hasattr(self.provider.foo.bar, "__dict__")
+
+    def test_getting_from_deep_namespaces(self):
+        provider = ServiceProvider()
+        provider.conf({"a.b.c.d.e.service": {"class": "tests.test_provider.MockServiceA"}})
+
+        assert provider.a.b.c.d.e.path == "a.b.c.d.e"
+        assert provider.a.b.c.d.e.service
+        assert provider.a.b.get("c.d.e.service")
+
     def test_setting_service_in_namespace(self):
         class Dummy:
             pass
@@ -0,0 +1,213 @@
+import threading
+import time
+import unittest
+
+from pyrovider.services.pool import Pool
+from pyrovider.services.provider import (
+    BadPoolOptionsError,
+    NotAPooledServiceError,
+    PoolExhaustedError,
+    ServiceProvider,
+)
+
+
+class Connection:
+    opened = 0
+
+    def __init__(self, url=None):
+        Connection.opened += 1
+        self.url = url
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def is_open(connection):
+    return not connection.closed
+
+
+class PoolTest(unittest.TestCase):
+    def test_reusing_released_objects(self):
+        # Given...
+        pool = Pool(Connection, max_size=2)
+        # When...
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        # Then...
+        self.assertIs(first, second)
+        self.assertEqual(1, pool.size)
+
+    def test_waiting_for_a_released_object(self):
+        # Given...
+        pool = Pool(Connection, max_size=1)
+        connection = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(connection,)).start()
+        # When, then...
+        self.assertIs(connection, pool.acquire(timeout=1))
+
+    def test_timing_out(self):
+        # Given...
+        pool = Pool(Connection, max_size=1)
+        pool.acquire()
+        # When, then...
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.01)
+
+    def test_dropping_invalid_objects(self):
+        # Given...
+        pool = Pool(Connection, max_size=1, validate=is_open)
+        connection = pool.acquire()
+        connection.close()
+        pool.release(connection)
+        # When...
+        new_connection = pool.acquire()
+        # Then...
+        self.assertIsNot(connection, new_connection)
+        self.assertEqual(1, pool.size)
+
+    def test_dropping_objects_failing_validation(self):
+        # Given...
+        def ping(connection):
+            raise ConnectionError()
+
+        pool = Pool(Connection, max_size=1, validate=ping)
+        connection = pool.acquire()
+        pool.release(connection)
+        # When...
+        with self.assertRaises(ConnectionError):
+            pool.acquire()
+        # Then...
+        self.assertTrue(connection.closed)
+        self.assertEqual(0, pool.size)
+        self.assertIsNot(connection, pool.acquire(timeout=0.01))
+
+    def test_closing_with_objects_checked_out(self):
+        # Given...
+        pool = Pool(Connection, max_size=1)
+        connection = pool.acquire()
+        # When...
+        pool.close()
+        pool.release(connection)
+        # Then...
+        self.assertTrue(connection.closed)
+        self.assertEqual(0, pool.size)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+    def test_evicting_idle_objects(self):
+        # Given...
+        pool = Pool(Connection, max_size=3, min_idle=1, idle_timeout=0.01)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        time.sleep(0.02)
+        # When...
+        connection = pool.acquire()
+        # Then...
+        self.assertIs(connections[2], connection)
+        self.assertEqual([True, True, False], [c.closed for c in connections])
+        self.assertEqual(1, pool.size)
+
+    def test_filling_up_to_min_idle(self):
+        # Given...
+        pool = Pool(Connection, max_size=3, min_idle=2)
+        # When...
+        pool.fill()
+        # Then...
+        self.assertEqual(2, pool.idle)
+        self.assertEqual(2, pool.size)
+
+    def test_bad_sizes(self):
+        with self.assertRaises(ValueError):
+            Pool(Connection, max_size=1, min_idle=2)
+
+
+class LeaseTest(unittest.TestCase):
+    def setUp(self):
+        # Given...
+        self.provider = ServiceProvider()
+        self.provider.conf(
+            {
+                "db": {
+                    "class": "tests.test_pool.Connection",
+                    "arguments": ["%db.url%"],
+                    "pool": {"max_size": 1, "min_idle": 1, "validate": "tests.test_pool.is_open"},
+                },
+                "not-pooled": {"class": "tests.test_pool.Connection"},
+                "bad-pool": {"class": "tests.test_pool.Connection", "pool": {"size": 1}},
+                "bad-sizes": {"class": "tests.test_pool.Connection", "pool": {"max_size": 0}},
+            },
+            {"db": {"url": "sqlite://"}},
+        )
+
+    def test_leasing_a_service(self):
+        # When...
+        with self.provider.lease("db") as connection:
+            self.assertEqual("sqlite://", connection.url)
+        # Then...
+        with self.provider.lease("db") as other_connection:
+            self.assertIs(connection, other_connection)
+
+    def test_leasing_from_an_exhausted_pool(self):
+        # Given...
+        lease = self.provider.lease("db", timeout=0.01)
+        # When, then...
+        with self.provider.lease("db"), self.assertRaises(PoolExhaustedError) as context, lease:
+            pass
+        self.assertEqual('No object of the service "db" was released within 0.01 seconds.', str(context.exception))
+
+    def test_leasing_from_a_parent_provider(self):
+        # Given...
+        self.provider.name = "parent"
+        provider = ServiceProvider(self.provider)
+        provider.conf({})
+        # When...
+        with provider.lease("parent.db") as connection:
+            pass
+        # Then...
+        with self.provider.lease("db") as other_connection:
+            self.assertIs(connection, other_connection)
+
+    def test_warming_up_pools(self):
+        # Given...
+        Connection.opened = 0
+        # When...
+        self.provider.warmup(["db"])
+        with self.provider.lease("db"):
+            pass
+        # Then...
+        self.assertEqual(1, Connection.opened)
+
+    def test_leasing_a_service_without_a_pool(self):
+        with self.assertRaises(NotAPooledServiceError), self.provider.lease("not-pooled"):
+            pass
+
+    def test_leasing_a_service_with_bad_pool_options(self):
+        with self.assertRaises(BadPoolOptionsError) as context, self.provider.lease("bad-pool"):
+            pass
+        self.assertEqual(
+            'The pool of the service "bad-pool" must be a mapping of some of: '
+            "max_size, min_idle, idle_timeout, validate.",
+            str(context.exception),
+        )
+
+        with self.assertRaises(BadPoolOptionsError), self.provider.lease("bad-sizes"):
+            pass
+
+    def test_closing_pools_on_conf(self):
+        # Given...
+        with self.provider.lease("db") as connection:
+            pass
+        # When...
+        self.provider.conf({})
+        # Then...
+        self.assertTrue(connection.closed)
+
+    def test_closing_leased_objects_on_conf(self):
+        # When...
+        with self.provider.lease("db") as connection:
+            self.provider.conf({})
+        # Then...
+        self.assertTrue(connection.closed)
@@ -7,11 +7,13 @@ import yaml
 
 from pyrovider.services.provider import (
     BadConfPathError,
+    CircularDependencyError,
     NoCreationMethodError,
     NotAServiceFactoryError,
     ServiceFactory,
     ServiceProvider,
     TooManyCreationMethodsError,
+    UnknownScopeError,
     UnknownServiceError,
 )
 
@@ -165,20 +167,194 @@ class ModelSchemataTest(unittest.TestCase):
     def test_getting_a_service_with_broken_dependencies(self):
         # When...
         self.provider = ServiceProvider()
-        self.provider.conf(self.service_conf)
         with self.assertRaises(BadConfPathError) as context:
-            self.provider.get("service-b")
+            self.provider.conf(self.service_conf)
         # Then...
         self.assertEqual(
             'The path "some_app" was not found in the app configuration.',
             str(context.exception),
         )
 
+    def test_getting_a_service_with_a_config_list_item_dependency(self):
+        # Given...
+        self.provider = ServiceProvider()
+        self.provider.conf(
+            {"service": {"class": "tests.test_env.Arguments", "arguments": ["%hosts.1.name%"]}},
+            {"hosts": [{"name": "a"}, {"name": "b"}]},
+        )
+        # When...
+        service = self.provider.get("service")
+        # Then...
+        self.assertEqual(("b",), service.args)
+
+    def test_configuring_a_service_with_a_broken_nested_dependency(self):
+        # Given...
+        self.provider = ServiceProvider()
+        # When, then...
+        with self.assertRaises(BadConfPathError) as context:
+            self.provider.conf(self.service_conf, {"some_app": {"api": {}}})
+        self.assertEqual(
+            'The path "url" was not found in the app configuration.',
+            str(context.exception),
+        )
+
     def test_getting_service_factory_without_build(self):
         # When, then...
         with self.assertRaises(NotImplementedError):
             self.provider.get("service-g")
 
+    def test_getting_a_transient_service(self):
+        # When, then...
+        self.assertIsNot(self.provider.get("service-a"), self.provider.get("service-a"))
+
+    def test_getting_a_singleton_service(self):
+        # When...
+        service_l = self.provider.get("service-l")
+        self.provider.reset()
+        # Then...
+        self.assertIs(service_l, self.provider.get("service-l"))
+
+    def test_getting_a_singleton_service_from_another_thread(self):
+        # Given...
+        import threading
+
+        services = []
+        # When...
+        thread = threading.Thread(target=lambda: services.append(self.provider.get("service-l")))
+        thread.start()
+        thread.join()
+        # Then...
+        self.assertIs(services[0], self.provider.get("service-l"))
+
+    def test_building_a_singleton_once_for_concurrent_threads(self):
+        # Given...
+        import threading
+
+        provider = ServiceProvider()
+        provider.conf(
+            {
+                "slow": {"class": "tests.test_provider.SlowService", "scope": "singleton"},
+                "dependent": {"class": "tests.test_provider.MockServiceI", "arguments": ["@slow", "@slow"]},
+            }
+        )
+        SlowService.instances = 0
+        services = []
+        # When...
+        threads = [threading.Thread(target=lambda: services.append(provider.get("dependent"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Then...
+        self.assertEqual(1, SlowService.instances)
+        self.assertEqual(1, len({id(service.some_services_1) for service in services}))
+
+    def test_sharing_every_service_by_default(self):
+        # Given...
+        provider = ServiceProvider(default_scope="singleton")
+        provider.conf(
+            {
+                "service-a": {"class": "tests.test_provider.MockServiceA"},
+                "service-m": {"class": "tests.test_provider.MockServiceA", "scope": "request"},
+            }
+        )
+        # When...
+        service_a = provider.get("service-a")
+        service_m = provider.get("service-m")
+        provider.reset()
+        # Then...
+        self.assertIs(service_a, provider.get("service-a"))
+        self.assertIsNot(service_m, provider.get("service-m"))
+
+    def test_warming_up_services(self):
+        # When...
+        self.provider.warmup(max_workers=4)
+        service_l = self.provider._singletons["service-l"]
+        # Then...
+        self.assertIsInstance(service_l, MockServiceA)
+        self.assertIs(service_l, self.provider.get("service-l"))
+        self.assertNotIn("service-m", self.provider._singletons)
+
+    def test_warming_up_unknown_services(self):
+        with self.assertRaises(UnknownServiceError):
+            self.provider.warmup(["service-unknown"])
+
+    def test_getting_many_services(self):
+        # When...
+        services = self.provider.get_many(["service-i", "service-b", "service-l"])
+        service_i = services["service-i"]
+        # Then...
+        self.assertEqual(["service-i", "service-b", "service-l"], list(services))
+        self.assertIs(services["service-b"], service_i.some_services_1[1])
+        self.assertIs(service_i.some_services_1[0], services["service-b"].service_a)
+        self.assertIs(services["service-l"], self.provider.get("service-l"))
+        self.assertIsNot(services["service-b"], self.provider.get("service-b"))
+        self.assertIsNot(services["service-b"], self.provider.get_many(["service-b"])["service-b"])
+
+    def test_getting_many_services_from_a_namespace(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf(
+            {
+                "foo.service-a": {"class": "tests.test_provider.MockServiceA"},
+                "foo.service-i": {
+                    "class": "tests.test_provider.MockServiceI",
+                    "arguments": ["@foo.service-a", "@foo.service-a"],
+                },
+            }
+        )
+        # When...
+        services = provider.foo.get_many(["service-i", "service-a"])
+        # Then...
+        self.assertEqual(["service-i", "service-a"], list(services))
+        self.assertIs(services["service-a"], services["service-i"].some_services_1)
+        self.assertIs(services["service-a"], services["service-i"].some_services_2)
+
+    def test_getting_a_graph_service(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf(
+            {
+                "service-a": {"class": "tests.test_provider.MockServiceA", "scope": "graph"},
+                "service-c": {"class": "tests.test_provider.MockServiceI", "arguments": ["@service-a", "@service-a"]},
+                "service-i": {"class": "tests.test_provider.MockServiceI", "arguments": ["@service-c", "@service-a"]},
+            }
+        )
+        # When...
+        service_i = provider.get("service-i")
+        # Then...
+        self.assertTrue(all(provider._plans[name].graph for name in ("service-a", "service-c", "service-i")))
+        self.assertIs(service_i.some_services_2, service_i.some_services_1.some_services_1)
+        self.assertIs(service_i.some_services_2, service_i.some_services_1.some_services_2)
+        self.assertIsNot(service_i.some_services_2, provider.get("service-i").some_services_2)
+        self.assertIsNot(provider.get("service-a"), provider.get("service-a"))
+
+    def test_getting_graph_services_by_default(self):
+        # Given...
+        provider = ServiceProvider(default_scope="graph")
+        provider.conf(yaml.safe_load((DATA_DIR / "service_conf_with_namespaces.yaml").read_text()))
+        # When...
+        service2 = provider.get("foo.service2")
+        # Then...
+        self.assertIs(service2.some_services_1, service2.some_services_2)
+        self.assertIsNot(service2.some_services_1, provider.get("foo.service2").some_services_1)
+
+    def test_getting_a_request_service(self):
+        # When...
+        service_m = self.provider.get("service-m")
+        # Then...
+        self.assertIs(service_m, self.provider.get("service-m"))
+        self.provider.reset()
+        self.assertIsNot(service_m, self.provider.get("service-m"))
+
+    def test_getting_a_service_with_an_unknown_scope(self):
+        with self.assertRaises(UnknownScopeError) as context:
+            self.provider.get("service-n")
+        self.assertEqual(
+            'The scope "forever" of the service "service-n" is not one of: transient, graph, request, singleton.',
+            str(context.exception),
+        )
+
     def test_setting_known_service(self):
         # Given...
         service = mock.MagicMock()
@@ -190,6 +366,21 @@ class ModelSchemataTest(unittest.TestCase):
         self.assertIsInstance(service, mock.MagicMock)
         self.assertEqual("Yeah", service.do())
 
+    def test_conf_compiles_service_plans(self):
+        # When...
+        plan = self.provider._plans["service-b"]
+        # Then...
+        self.assertEqual("class", plan.kind)
+        self.assertEqual("tests.test_provider.MockServiceB", plan.path)
+        self.assertEqual(7, len(plan.args))
+        self.assertEqual(["password"], [k for k, _ in plan.kwargs])
+
+    def test_setting_known_service_to_a_falsy_value(self):
+        # When...
+        self.provider.set("service-a", None)
+        # Then...
+        self.assertIsNone(self.provider.get("service-a"))
+
     def test_setting_unknown_service(self):
         # Given...
         service = mock.MagicMock()
@@ -250,9 +441,254 @@ class MockServiceFactory(ServiceFactory):
         return service_c
 
 
+class SlowService:
+    instances = 0
+
+    def __init__(self):
+        import time
+
+        time.sleep(0.05)
+        SlowService.instances += 1
+
+
 class MockServiceFactoryWithoutBuild(ServiceFactory):
     pass
 
 
 def mock_service_instance():
     pass
+
+
+class ParentProvidersTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.base = ServiceProvider(name="base")
+        self.base.conf({"service-a": {"class": "tests.test_provider.MockServiceA"}})
+        self.shared = ServiceProvider(name="shared")
+        self.shared.conf({"service-h": {"instance": "tests.test_provider.mock_service_instance"}})
+        self.app = ServiceProvider(self.shared, self.base, name="app")
+        self.app.conf({})
+        self.provider = ServiceProvider(self.app)
+        self.provider.conf({})
+
+    def test_getting_services_from_parents(self):
+        self.assertIsInstance(self.provider.get("app.base.service-a"), MockServiceA)
+        self.assertIs(mock_service_instance, self.provider.get("app.shared.service-h"))
+
+    def test_getting_services_from_any_parent_by_attribute(self):
+        self.assertIsInstance(getattr(self.app, "base.service-a"), MockServiceA)
+        self.assertIs(mock_service_instance, getattr(self.provider, "app.shared.service-h"))
+
+    def test_routing_to_the_owning_provider(self):
+        self.assertEqual((self.base, "service-a"), self.provider._get_route("app.base.service-a"))
+
+    def test_reconfiguring_a_parent(self):
+        # Given...
+        self.provider.get("app.base.service-a")
+        # When...
+        self.base.conf({"service-b": {"class": "tests.test_provider.MockServiceA"}})
+        # Then...
+        self.assertIsInstance(self.provider.get("app.base.service-b"), MockServiceA)
+        with self.assertRaises(UnknownServiceError):
+            self.provider.get("app.base.service-a")
+
+    def test_renaming_a_parent(self):
+        # Given...
+        self.provider.get("app.base.service-a")
+        # When...
+        self.base.name = "core"
+        # Then...
+        self.assertIsInstance(self.provider.get("app.core.service-a"), MockServiceA)
+
+
+class ChildProvidersTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.provider = ServiceProvider()
+        self.provider.conf(
+            {
+                "service-a": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+                "service-l": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+                "foo.service-i": {
+                    "class": "tests.test_provider.MockServiceI",
+                    "arguments": ["@service-a", "@service-l"],
+                    "scope": "singleton",
+                },
+                "foo.service-j": {"class": "tests.test_provider.MockServiceI", "arguments": ["@foo.service-i", None]},
+            }
+        )
+
+    def test_overriding_services_in_a_child(self):
+        # Given...
+        service_l = self.provider.get("service-l")
+        service_i = self.provider.get("foo.service-i")
+        # When...
+        child = self.provider.child({"service-a": {"class": "tests.test_provider.MockServiceC", "scope": "singleton"}})
+        # Then...
+        self.assertEqual({"service-a", "foo.service-i", "foo.service-j"}, set(child._own_plans))
+        self.assertIsInstance(child.get("service-a"), MockServiceC)
+        self.assertIs(child.get("service-l"), service_l)
+        self.assertIsNot(child.foo.get("service-i"), service_i)
+        self.assertIs(child.foo.get("service-i").some_services_1, child.get("service-a"))
+        self.assertIs(child.get("foo.service-j").some_services_1, child.get("foo.service-i"))
+        self.assertIs(self.provider.get("foo.service-i"), service_i)
+        self.assertIsInstance(self.provider.get("service-a"), MockServiceA)
+
+    def test_adding_services_in_a_child(self):
+        # When...
+        child = self.provider.child({"service_z": {"class": "tests.test_provider.MockServiceA"}})
+        # Then...
+        self.assertEqual({"service_z"}, set(child._own_plans))
+        self.assertEqual(["service-a", "service-l", "service_z"], child.service_names)
+        self.assertEqual(["foo"], child.namespaces)
+        self.assertIsInstance(child.service_z, MockServiceA)
+        with self.assertRaises(UnknownServiceError):
+            self.provider.get("service_z")
+
+    def test_setting_services_in_a_child(self):
+        # Given...
+        child = self.provider.child()
+        # When...
+        child.set("service-l", "set")
+        # Then...
+        self.assertEqual("set", child.get("service-l"))
+        self.assertIsInstance(self.provider.get("service-l"), MockServiceA)
+
+    def test_setting_dependencies_of_shared_services_in_a_child(self):
+        # Given...
+        service_i = self.provider.get("foo.service-i")
+        child = self.provider.child()
+        # When...
+        child.set("service-a", "set")
+        # Then...
+        self.assertEqual("set", child.get("foo.service-i").some_services_1)
+        self.assertEqual("set", child.get("foo.service-j").some_services_1.some_services_1)
+        self.assertIs(child.get("service-l"), self.provider.get("service-l"))
+        self.assertIs(service_i, self.provider.get("foo.service-i"))
+
+    def test_not_getting_services_set_in_the_base_in_a_child(self):
+        # Given...
+        child = self.provider.child()
+        # When...
+        self.provider.set("service-a", "set")
+        # Then...
+        self.assertEqual("set", self.provider.get("foo.service-i").some_services_1)
+        self.assertIsInstance(child.get("foo.service-i").some_services_1, MockServiceA)
+        self.assertIsInstance(child.get("service-a"), MockServiceA)
+
+    def test_patching_a_provider(self):
+        # When...
+        with mock.patch.object(self.provider, "get", return_value="patched"):
+            service = self.provider.get("service-a")
+        # Then...
+        self.assertEqual("patched", service)
+        self.assertIsInstance(self.provider.get("service-a"), MockServiceA)
+
+    def test_overriding_services_with_a_cycle(self):
+        with self.assertRaises(CircularDependencyError):
+            self.provider.child(
+                {"service-a": {"class": "tests.test_provider.MockServiceI", "arguments": ["@foo.service-j", None]}}
+            )
+
+    def test_overriding_the_app_conf_in_a_child(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf(
+            {
+                "service-a": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+                "service-i": {
+                    "class": "tests.test_provider.MockServiceI",
+                    "arguments": ["@service-a", "%app.db.url%"],
+                    "scope": "singleton",
+                },
+                "service-j": {"class": "tests.test_provider.MockServiceI", "arguments": ["@service-i", "%app.name%"]},
+            },
+            {"app": {"name": "app", "db": {"url": "db://app", "options": {"timeout": 1}}}},
+        )
+        service_a = provider.get("service-a")
+        # When...
+        child = provider.child(app_overrides={"app": {"db": {"url": "db://tenant", "options": None}}})
+        # Then...
+        self.assertEqual({"service-i", "service-j"}, set(child._own_plans))
+        self.assertEqual({"name": "app", "db": {"url": "db://tenant", "options": None}}, child.app_conf["app"])
+        self.assertEqual("db://tenant", child.get("service-i").some_services_2)
+        self.assertEqual("app", child.get("service-j").some_services_2)
+        self.assertIs(child.get("service-i").some_services_1, service_a)
+        self.assertEqual("db://app", provider.get("service-i").some_services_2)
+        self.assertEqual({"timeout": 1}, provider.app_conf["app"]["db"]["options"])
+
+    def test_removing_app_conf_values_referenced_in_a_child(self):
+        # Given...
+        provider = ServiceProvider()
+        provider.conf(
+            {"service-i": {"class": "tests.test_provider.MockServiceI", "arguments": [None, "%app.db.url%"]}},
+            {"app": {"db": {"url": "db://app"}}},
+        )
+        # When...
+        with self.assertRaises(BadConfPathError) as context:
+            provider.child(app_overrides={"app": {"db": "db://tenant"}})
+        # Then...
+        self.assertEqual(ServiceProvider.BAD_CONF_PATH_ERRMSG.format("url"), str(context.exception))
+
+
+class ForkHooksTest(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        # Given...
+        self.provider = ServiceProvider()
+        self.provider.conf(
+            {
+                "service-a": {"class": "tests.test_provider.MockServiceA", "scope": "singleton", "preload": True},
+                "service-l": {"class": "tests.test_provider.MockServiceA", "scope": "singleton", "fork_unsafe": True},
+                "service-i": {
+                    "class": "tests.test_provider.MockServiceI",
+                    "arguments": ["@service-a", "@service-l"],
+                    "scope": "singleton",
+                    "preload": True,
+                },
+                "service-j": {
+                    "class": "tests.test_provider.MockServiceI",
+                    "arguments": ["^tests.test_provider.mock_service_instance", None],
+                },
+                "service-k": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+            }
+        )
+
+    def test_warming_up_before_forking(self):
+        # When...
+        with mock.patch.object(self.provider.importer, "get_obj", wraps=self.provider.importer.get_obj) as get_obj:
+            self.provider.prefork_warmup()
+        # Then...
+        self.assertEqual(
+            {
+                "tests.test_provider.MockServiceA",
+                "tests.test_provider.MockServiceI",
+                "tests.test_provider.mock_service_instance",
+            },
+            {call.args[0] for call in get_obj.call_args_list},
+        )
+        self.assertEqual({"service-a", "service-l", "service-i"}, set(self.provider._singletons))
+
+    def test_dropping_fork_unsafe_services_after_forking(self):
+        # Given...
+        self.provider.prefork_warmup()
+        service_a = self.provider.get("service-a")
+        service_l = self.provider.get("service-l")
+        service_i = self.provider.get("service-i")
+        service_k = self.provider.get("service-k")
+        # When...
+        dropped = self.provider.after_fork()
+        # Then...
+        self.assertEqual({"service-l", "service-i"}, dropped)
+        # The preloaded service-i is built again, along with the service-l it depends on.
+        self.assertEqual({"service-a", "service-l", "service-i", "service-k"}, set(self.provider._singletons))
+        self.assertIs(service_a, self.provider.get("service-a"))
+        self.assertIs(service_k, self.provider.get("service-k"))
+        self.assertIsNot(service_l, self.provider.get("service-l"))
+        self.assertIsNot(service_i, self.provider.get("service-i"))
+        self.assertIs(self.provider.get("service-i").some_services_2, self.provider.get("service-l"))
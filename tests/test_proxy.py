@@ -0,0 +1,84 @@
+import asyncio
+import collections.abc
+import inspect
+import unittest
+from unittest import mock
+
+from pyrovider.meta.proxy import LazyProxy
+
+
+class LazyProxyTest(unittest.TestCase):
+    maxDiff = None
+
+    def test_building_on_first_use(self):
+        # Given...
+        factory = mock.Mock(return_value=["a", "b"])
+        proxy = LazyProxy(factory)
+        # When, then...
+        factory.assert_not_called()
+        self.assertEqual(2, len(proxy))
+        self.assertEqual("a", proxy[0])
+        self.assertIn("b", proxy)
+        factory.assert_called_once_with()
+
+    def test_forwarding_attributes(self):
+        # Given...
+        class Thing:
+            value = 1
+
+        proxy = LazyProxy(Thing)
+        # When...
+        proxy.value = 2
+        # Then...
+        self.assertEqual(2, proxy.value)
+        self.assertIsInstance(proxy, Thing)
+        self.assertEqual(2, proxy.__wrapped__.value)
+
+    def test_repr_does_not_build(self):
+        # Given...
+        factory = mock.Mock(return_value="thing")
+        proxy = LazyProxy(factory)
+        # When, then...
+        self.assertEqual("<LazyProxy (unbuilt)>", repr(proxy))
+        factory.assert_not_called()
+        self.assertEqual("thing", str(proxy))
+        self.assertEqual("'thing'", repr(proxy))
+
+    def test_forwarding_operators(self):
+        # Given...
+        proxy = LazyProxy(lambda: 5)
+        # When, then...
+        self.assertEqual(6, proxy + 1)
+        self.assertEqual(6, 1 + proxy)
+        self.assertEqual((2, 1), divmod(proxy, 2))
+        self.assertEqual(4, proxy & 6)
+        self.assertTrue(proxy < 6)
+        self.assertTrue(proxy >= 5)
+        self.assertEqual(-5, -proxy)
+        self.assertEqual(5, int(proxy))
+        self.assertEqual(5.0, float(proxy))
+        self.assertEqual("b", ["a", "b", "c", "d", "e", "f"][proxy - 4])
+        self.assertEqual([0, 1, 2, 3, 4], list(range(proxy)))
+
+    def test_forwarding_async_context_managers(self):
+        # Given...
+        class Client:
+            async def __aenter__(self):
+                return "connected"
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        async def use(proxy):
+            async with proxy as connection:
+                return connection
+
+        # When, then...
+        self.assertEqual("connected", asyncio.run(use(LazyProxy(Client))))
+
+    def test_not_looking_awaitable(self):
+        # Given...
+        proxy = LazyProxy(lambda: "thing")
+        # When, then...
+        self.assertFalse(inspect.isawaitable(proxy))
+        self.assertNotIsInstance(proxy, collections.abc.AsyncIterable)
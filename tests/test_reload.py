@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from pyrovider.services import factories
+from pyrovider.services.provider import BadConfPathError, CircularDependencyError, ServiceProvider
+from pyrovider.services.watcher import ConfWatcher
+
+from .test_provider import MockServiceA, MockServiceI
+
+SERVICE_CONF = {
+    "a": {"class": "tests.test_provider.MockServiceA", "scope": "singleton"},
+    "b": {"class": "tests.test_provider.MockServiceI", "arguments": ["@a", "%app.url%"], "scope": "singleton"},
+    "c": {"class": "tests.test_provider.MockServiceI", "arguments": ["@b", None], "scope": "singleton"},
+    "d": {"class": "tests.test_provider.MockServiceA", "scope": "singleton", "pool": {"max_size": 1}},
+}
+APP_CONF = {"app": {"url": "https://example.com", "name": "app"}}
+
+
+@pytest.fixture
+def provider():
+    provider = ServiceProvider()
+    provider.conf(SERVICE_CONF, APP_CONF)
+
+    return provider
+
+
+def get_all(provider: ServiceProvider) -> dict:
+    return {name: provider.get(name) for name in ("a", "b", "c", "d")}
+
+
+def test_reconf_drops_changed_services_and_their_dependents(provider):
+    services = get_all(provider)
+    service_conf = {**SERVICE_CONF, "b": {**SERVICE_CONF["b"], "arguments": ["@a", "other"]}}
+
+    invalidated = provider.reconf(service_conf, APP_CONF)
+
+    assert invalidated == {"b", "c"}
+    assert provider.get("a") is services["a"]
+    assert provider.get("d") is services["d"]
+    assert provider.get("b") is not services["b"]
+    assert provider.get("b").some_services_2 == "other"
+    assert provider.get("c").some_services_1 is provider.get("b")
+
+
+def test_reconf_drops_services_referencing_changed_app_conf_values(provider):
+    services = get_all(provider)
+
+    invalidated = provider.reconf(SERVICE_CONF, {"app": {"url": "https://example.org", "name": "other"}})
+
+    assert invalidated == {"b", "c"}
+    assert provider.get("a") is services["a"]
+    assert provider.get("b").some_services_2 == "https://example.org"
+
+
+def test_reconf_adds_and_removes_services(provider):
+    service_conf = {name: definition for name, definition in SERVICE_CONF.items() if name != "a"}
+    service_conf["a"] = {"class": "tests.test_provider.MockServiceB"}
+    service_conf["e"] = {"class": "tests.test_provider.MockServiceA"}
+    del service_conf["d"]
+
+    invalidated = provider.reconf(service_conf, APP_CONF)
+
+    assert invalidated == {"a", "b", "c", "d", "e"}
+    assert provider.service_names == ["b", "c", "a", "e"]
+    assert isinstance(provider.get("e"), MockServiceA)
+
+
+def test_reconf_closes_the_pools_of_invalidated_services(provider):
+    with provider.lease("d") as obj:
+        pass
+
+    provider.reconf({**SERVICE_CONF, "d": {**SERVICE_CONF["d"], "pool": {"max_size": 2}}}, APP_CONF)
+
+    with provider.lease("d") as other_obj:
+        assert other_obj is not obj
+
+
+@pytest.mark.parametrize(
+    "service_conf, app_conf, error",
+    [
+        (
+            {**SERVICE_CONF, "a": {"class": "tests.test_provider.MockServiceI", "arguments": ["@c", None]}},
+            APP_CONF,
+            CircularDependencyError,
+        ),
+        (SERVICE_CONF, {"app": {"name": "app"}}, BadConfPathError),
+    ],
+)
+def test_failed_reconf_keeps_the_current_conf(provider, service_conf, app_conf, error):
+    services = get_all(provider)
+
+    with pytest.raises(error):
+        provider.reconf(service_conf, app_conf)
+
+    assert provider.service_conf is SERVICE_CONF
+    assert get_all(provider) == services
+
+
+def test_singletons_built_from_replaced_plans_are_not_kept(provider):
+    old_plan = provider._plans["b"]
+    provider.reconf({**SERVICE_CONF, "a": {"class": "tests.test_provider.MockServiceA"}}, APP_CONF)
+
+    service = provider._get_singleton_service(old_plan)
+
+    assert isinstance(service, MockServiceI)
+    assert "b" not in provider._singletons
+
+
+@pytest.mark.parametrize("poll", [False, True])
+def test_watching_files(tmp_path, poll):
+    path = tmp_path / "services.yaml"
+    path.write_text("a: 1\n")
+    reloads = []
+
+    with ConfWatcher(lambda: [str(path)], lambda: reloads.append(path.read_text()), interval=0.05, poll=poll):
+        time.sleep(0.1)
+        path.write_text("a: 22\n")
+        wait_for(lambda: reloads)
+
+    assert reloads == ["a: 22\n"]
+
+
+def test_reloading_providers_from_watched_sources(tmp_path):
+    (tmp_path / "a.yaml").write_text("service-a:\n  class: tests.test_provider.MockServiceA\n  scope: singleton\n")
+    provider = factories.service_provider_from_sources(
+        factories.ServiceDefinitionSource("test", tmp_path), watch=True, watch_interval=0.05
+    )
+    service_a = provider.get("test.service-a")
+
+    try:
+        (tmp_path / "b.yaml").write_text("service-b:\n  class: tests.test_provider.MockServiceA\n")
+        wait_for(lambda: "service-b" in provider.test.service_names)
+    finally:
+        provider.watcher.stop()
+
+    assert provider.get("test.service-a") is service_a
+    assert isinstance(provider.get("test.service-b"), MockServiceA)
+
+
+def test_watching_again_after_forking(provider, tmp_path):
+    path = tmp_path / "services.yaml"
+    path.write_text("a: 1\n")
+    reloads = []
+    provider.watcher = ConfWatcher(lambda: [str(path)], lambda: reloads.append(path.read_text()), interval=0.05)
+    # As in a forked process: the watcher thinks it's running, but its thread is the parent's.
+    provider.watcher._thread = parent_thread = threading.Thread(target=lambda: None)
+
+    provider.after_fork()
+
+    try:
+        assert provider.watcher._thread is not parent_thread
+        path.write_text("a: 22\n")
+        wait_for(lambda: reloads)
+    finally:
+        provider.watcher.stop()
+
+    assert reloads == ["a: 22\n"]
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out."
+        time.sleep(0.01)
@@ -22,6 +22,14 @@ class AnotherClass:
         self.collaborator = collaborator
 
 
+class Counted:
+    built = 0
+
+    def __init__(self, collaborator=None):
+        Counted.built += 1
+        self.collaborator = collaborator
+
+
 class Factory:
     @classmethod
     def build(cls, *args, **kwargs):
@@ -133,3 +141,28 @@ def test_use_factories(tmp_path: pathlib.Path):
     app_services = service_provider_from_yaml(str(app_services_yaml))
     built_object = app_services.get("entity.factory")
     assert built_object == ((), {})
+
+
+def test_lazy_services(tmp_path: pathlib.Path):
+    app_services_yaml = tmp_path / "app_services.yaml"
+    app_services_yaml.write_text(
+        """
+        entity.expensive:
+          class: tests.test_service_provider_from_yaml.Counted
+          lazy: true
+
+        entity.cheap:
+          class: tests.test_service_provider_from_yaml.AnotherClass
+          arguments:
+            - '@entity.expensive'
+        """
+    )
+    Counted.built = 0
+
+    app_services = service_provider_from_yaml(str(app_services_yaml))
+    cheap = app_services.get("entity.cheap")
+    assert Counted.built == 0
+
+    assert cheap.collaborator.collaborator is None
+    assert isinstance(cheap.collaborator, Counted)
+    assert Counted.built == 1
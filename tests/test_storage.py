@@ -0,0 +1,77 @@
+import asyncio
+import importlib.util
+import threading
+import unittest
+
+from pyrovider.services.provider import ServiceProvider
+from pyrovider.services.storage import ContextVarLocalStorage, WerkzeugLocalStorage
+
+
+class ContextVarLocalStorageTest(unittest.TestCase):
+    maxDiff = None
+    storage_class = ContextVarLocalStorage
+
+    def setUp(self):
+        # Given...
+        self.storage = self.storage_class()
+
+    def test_getting_the_same_state(self):
+        self.assertIs(self.storage.get_state(), self.storage.get_state())
+
+    def test_releasing_the_state(self):
+        # Given...
+        state = self.storage.get_state()
+        # When...
+        self.storage.release()
+        # Then...
+        self.assertIsNot(state, self.storage.get_state())
+
+    def test_getting_a_state_per_thread(self):
+        # Given...
+        states = []
+        # When...
+        thread = threading.Thread(target=lambda: states.append(self.storage.get_state()))
+        thread.start()
+        thread.join()
+        # Then...
+        self.assertIsNot(states[0], self.storage.get_state())
+
+    def test_getting_a_state_per_task(self):
+        # Given...
+        async def get_states():
+            return await asyncio.gather(self._get_state_later(), self._get_state_later())
+
+        # When...
+        state_a, state_b = asyncio.run(get_states())
+        # Then...
+        self.assertIsNot(state_a, state_b)
+
+    def test_getting_a_state_per_task_after_the_parent_got_one(self):
+        # Given...
+        provider = ServiceProvider(storage=self.storage_class())
+        provider.conf({"r": {"instance": "tests.test_provider.mock_service_instance"}})
+
+        async def set_and_get(i):
+            provider.set("r", i)
+            await asyncio.sleep(0)
+            return provider.get("r")
+
+        async def handle():
+            provider.set("r", 0)
+            results = await asyncio.gather(set_and_get(1), set_and_get(2))
+            return results, provider.get("r")
+
+        # When...
+        results, parent_result = asyncio.run(handle())
+        # Then...
+        self.assertEqual([1, 2], results)
+        self.assertEqual(0, parent_result)
+
+    async def _get_state_later(self):
+        await asyncio.sleep(0)
+        return self.storage.get_state()
+
+
+@unittest.skipIf(importlib.util.find_spec("werkzeug") is None, "werkzeug is not installed")
+class WerkzeugLocalStorageTest(ContextVarLocalStorageTest):
+    storage_class = WerkzeugLocalStorage
@@ -0,0 +1,54 @@
+import os
+import pathlib
+from unittest import mock
+
+from pyrovider.tools import yamltools
+
+
+def test_load_yaml(tmp_path: pathlib.Path):
+    path = tmp_path / "conf.yaml"
+    path.write_text("service:\n  class: some.Class\n")
+
+    assert yamltools.load_yaml(path) == {"service": {"class": "some.Class"}}
+
+
+def test_load_yaml_from_cache(tmp_path: pathlib.Path):
+    path = tmp_path / "conf.yaml"
+    path.write_text("service:\n  class: some.Class\n")
+    cache_dir = tmp_path / "cache"
+
+    assert yamltools.load_yaml(path, cache_dir) == {"service": {"class": "some.Class"}}
+    assert len(list(cache_dir.iterdir())) == 1
+
+    with mock.patch("yaml.load") as load:
+        assert yamltools.load_yaml(path, cache_dir) == {"service": {"class": "some.Class"}}
+
+        # Touching the file without changing it doesn't parse it again either
+        os.utime(path, ns=(0, 0))
+        assert yamltools.load_yaml(path, cache_dir) == {"service": {"class": "some.Class"}}
+
+    load.assert_not_called()
+
+
+def test_load_yaml_after_a_change(tmp_path: pathlib.Path):
+    path = tmp_path / "conf.yaml"
+    path.write_text("service:\n  class: some.Class\n")
+    cache_dir = tmp_path / "cache"
+    yamltools.load_yaml(path, cache_dir)
+
+    path.write_text("service:\n  class: other.Class\n")
+    os.utime(path, ns=(0, 0))
+
+    assert yamltools.load_yaml(path, cache_dir) == {"service": {"class": "other.Class"}}
+
+
+def test_load_yaml_with_a_broken_cache(tmp_path: pathlib.Path):
+    path = tmp_path / "conf.yaml"
+    path.write_text("service:\n  class: some.Class\n")
+    cache_dir = tmp_path / "cache"
+    yamltools.load_yaml(path, cache_dir)
+
+    for cache_path in cache_dir.iterdir():
+        cache_path.write_bytes(b"broken")
+
+    assert yamltools.load_yaml(path, cache_dir) == {"service": {"class": "some.Class"}}